@@ -5,17 +5,228 @@ A laboratory tool for calculating drug solution preparations.
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox, font as tkfont
 from pathlib import Path
+import math
 import sys
+import threading
+from functools import lru_cache
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent / "src"))
+# Add src to path (once; re-running the module must not grow sys.path)
+_SRC_DIR = str(Path(__file__).parent / "src")
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
 
-from calculators import calculate_stock_from_powder, calculate_dilution, validate_inputs
-from data_storage import CalculationHistory
+from calculators import calculate_stock_from_powder, calculate_dilution
+from data_storage import CalculationHistory, filter_calculations, has_non_finite
 from formatters import format_number, validate_decimal_input, format_result_with_unit, convert_to_readable_unit
-from gui_integration import MolecularWeightLookupWidget, AboutDialog
+# gui_integration pulls in pubchempy; it is imported where first needed so
+# the welcome screen comes up without it
+
+
+# The closed set of unit strings, interned once and shared by the unit
+# menus and the conversion tables below
+_CONC_UNITS = tuple(map(sys.intern, ('M', 'mM', 'µM', 'nM')))
+_VOL_UNITS = tuple(map(sys.intern, ('L', 'mL', 'µL')))
+_U_M, _U_mM, _U_uM, _U_nM = _CONC_UNITS
+_V_L, _V_mL, _V_uL = _VOL_UNITS
+
+# The calculators are pure, so re-clicking Calculate on unchanged inputs
+# reuses the last result. Call sites take a copy because results are
+# stored in the history.
+_cached_stock_from_powder = lru_cache(maxsize=256)(calculate_stock_from_powder)
+_cached_dilution = lru_cache(maxsize=256)(calculate_dilution)
+
+# Solvent suggestions, most common first for each calculator
+_STOCK_SOLVENTS = ("DMSO", "Water", "Ethanol", "PBS", "Media", "Other")
+_DIL_SOLVENTS = ("Media", "PBS", "Water", "DMSO", "Ethanol", "Other")
+
+# Concentration units as powers of ten relative to molar (M)
+_UNIT_EXP = {_U_M: 0, _U_mM: -3, _U_uM: -6, _U_nM: -9}
+
+# (from_unit, to_unit) -> multiplier, flattened once so a conversion is one lookup
+_CONC_FACTORS = {
+    (src, dst): 10.0 ** (src_exp - dst_exp)
+    for src, src_exp in _UNIT_EXP.items()
+    for dst, dst_exp in _UNIT_EXP.items()
+}
+
+# Separator lines, built once for all templates below
+_RULE_60, _DIVIDER_60 = '═' * 60, '─' * 60
+_RULE_70, _DIVIDER_70 = '═' * 70, '─' * 70
+
+# Shown when no solvent was entered
+_NO_SOLVENT = "Not specified"
+
+# Result popup templates, filled in with str.format_map()
+_STOCK_TEMPLATE = f"""{_RULE_60}
+STOCK SOLUTION
+{_RULE_60}
+
+Drug:                {{drug_name}}
+Molecular Weight:    {{mw}} g/mol
+Target:              {{conc}} {{conc_unit}} in {{vol}} {{vol_unit}}
+Solvent:             {{solvent}}
+
+{_DIVIDER_60}
+WEIGH:  {{mass}}
+DISSOLVE IN:  {{vol}} {{vol_unit}} {{solvent_name}}
+{_DIVIDER_60}"""
+
+_DILUTION_TEMPLATE = f"""{_RULE_60}
+WORKING SOLUTION
+{_RULE_60}
+
+Drug:                {{drug_name}}
+From Stock:          {{stock_conc}} {{stock_conc_unit}}
+Target:              {{target_conc}} {{target_conc_unit}} in {{target_vol}} {{vol_unit}}
+Dilution Factor:     {{dilution_factor}}x
+Solvent:             {{solvent}}
+
+{_DIVIDER_60}
+TAKE:  {{stock_vol}} {{stock_vol_unit}} of stock
+ADD:   {{solvent_vol}} {{solvent_vol_unit}} of {{solvent_name}}
+{_DIVIDER_60}"""
+
+# History details templates, built once instead of per opened entry
+_DETAILS_HEADER_TEMPLATE = f"""{_RULE_70}
+#{{display_num}} │ {{timestamp}} │ {{drug_name}}
+{_RULE_70}
+
+"""
+
+_STOCK_DETAILS_TEMPLATE = f"""STOCK SOLUTION
+
+Drug:                {{drug_name}}
+Molecular Weight:    {{mw}} g/mol
+Target:              {{conc}} {{conc_unit}} in {{vol}} {{vol_unit}}
+Solvent:             {{solvent}}
+
+{_DIVIDER_70}
+WEIGH:  {{mass_mg}} mg
+DISSOLVE IN:  {{vol}} {{vol_unit}} of {{solvent}}
+{_DIVIDER_70}
+"""
+
+_DILUTION_DETAILS_TEMPLATE = f"""WORKING SOLUTION
+
+Drug:                {{drug_name}}
+From Stock:          {{stock_conc}} {{stock_conc_unit}}
+Target:              {{target_conc}} {{target_conc_unit}} in {{target_vol}} {{vol_unit}}
+Dilution Factor:     {{dilution}}x
+Solvent:             {{solvent}}
+
+{_DIVIDER_70}
+TAKE:  {{stock_vol}} {{stock_vol_unit}} of stock
+ADD:   {{solvent_vol}} {{solvent_vol_unit}} of {{solvent}}
+{_DIVIDER_70}
+"""
+
+# History table "Concentration & Volume" column
+_HISTORY_VALUE_TEMPLATE = "{conc} {conc_unit} in {vol} {vol_unit}"
+
+# Alternating Treeview row tags, indexed by row number % 2
+_ROW_TAGS = (('evenrow',), ('oddrow',))
+
+# Protocol popups: (width, height, text rows, text columns)
+_PROTOCOL_WINDOW_SIZES = {
+    'results': (650, 400, 15, 70),
+    'details': (700, 450, 18, 80),
+}
+
+# Treeview rows inserted at a time; further pages load on scroll
+_HISTORY_PAGE_SIZE = 200
+
+# History "Show:" choices mapped to stored calculation_type values
+_HISTORY_FILTER_TYPES = {
+    "Stock Solutions": "Stock from Powder",
+    "Working Solutions": "Working from Stock",
+}
+
+# History name sort orders -> reverse flag for sorted()
+_HISTORY_NAME_SORTS = {
+    "Drug name (A-Z)": False,
+    "Drug name (Z-A)": True,
+}
+
+# Welcome screen buttons: (label, DrugCalculatorApp method to call)
+_WELCOME_BUTTONS = (
+    ("Stock Solution Calculator\n(Powder → Stock)", 'show_stock_calculator'),
+    ("Working Solution Calculator\n(Stock → Working)", 'show_dilution_calculator'),
+    ("View Calculation History", 'show_history'),
+)
+
+# (error label, noun) for the stock calculator's numeric fields, in input order
+_STOCK_NUMERIC_FIELDS = (
+    ("Molecular Weight", "Molecular weight"),
+    ("Target Concentration", "Concentration"),
+    ("Target Volume", "Volume"),
+)
+
+# The same for the dilution calculator's numeric fields
+_DILUTION_NUMERIC_FIELDS = (
+    ("Stock Concentration", "Stock concentration"),
+    ("Target Concentration", "Target concentration"),
+    ("Target Volume", "Volume"),
+)
+
+
+class _InputError(ValueError):
+    """Invalid user input; the message is shown to the user as-is."""
+
+
+def _parse_positive_floats(items):
+    """
+    Validate and parse positive numbers from text inputs.
+    
+    Parameters
+    ----------
+    items : iterable of (str, str, str)
+        (error label, noun, raw text) for each field, in input order
+        
+    Returns
+    -------
+    list of float
+        The parsed values, in the same order
+        
+    Raises
+    ------
+    _InputError
+        For the first field that is not a valid, finite, positive number
+    """
+    values = []
+    for field, quantity, raw in items:
+        is_valid, _, error_msg = validate_decimal_input(raw)
+        if not is_valid:
+            raise _InputError(f"{field}: {error_msg}")
+        value = float(raw)
+        # The pattern admits huge exponents such as "1e400", which parse to inf
+        if not math.isfinite(value):
+            raise _InputError(f"{field}: Please enter a smaller number")
+        if value <= 0:
+            raise _InputError(f"{quantity} must be positive")
+        values.append(value)
+    return values
+
+
+def _grid_stretch(widget, rows=(0,), cols=(0,)):
+    """
+    Give grid rows and columns of a container weight 1.
+    
+    Each axis is configured with a single Tcl call, however many
+    indices are listed.
+    
+    Parameters
+    ----------
+    widget : tk.Widget
+        Grid container to configure
+    rows : tuple of int, default=(0,)
+        Row indices that should expand
+    cols : tuple of int, default=(0,)
+        Column indices that should expand
+    """
+    widget.rowconfigure(rows, weight=1)
+    widget.columnconfigure(cols, weight=1)
 
 
 class ToolTip:
@@ -25,7 +236,7 @@ class ToolTip:
     How it works:
     - When mouse enters widget → show tooltip
     - When mouse leaves widget → hide tooltip
-    - Creates temporary window for the tooltip text
+    - All tooltips share one hidden window that is moved and relabelled
     
     Parameters
     ----------
@@ -39,45 +250,59 @@ class ToolTip:
     info_icon = ttk.Label(frame, text="ℹ️")
     ToolTip(info_icon, "Use period (.) for decimal numbers")
     """
+    # Shared tooltip window, created on first hover
+    _window = None
+    _label = None
+    _owner = None
+    
     def __init__(self, widget, text):
         self.widget = widget
         self.text = text
-        self.tooltip_window = None
         
         # Bind hover events
         self.widget.bind("<Enter>", self.show_tooltip)
         self.widget.bind("<Leave>", self.hide_tooltip)
     
+    @classmethod
+    def _create_window(cls, master):
+        """Create the shared, initially hidden tooltip window."""
+        cls._window = tk.Toplevel(master)
+        cls._window.withdraw()
+        cls._window.wm_overrideredirect(True)  # Remove window decorations
+        
+        # Tooltip content with light yellow background
+        cls._label = ttk.Label(
+            cls._window,
+            background="lightyellow",
+            relief="solid",
+            borderwidth=1,
+            padding=5
+        )
+        cls._label.pack()
+    
     def show_tooltip(self, event=None):
         """Display the tooltip when mouse enters widget."""
-        if self.tooltip_window:
+        cls = type(self)
+        if cls._owner is self:
             return
+        if cls._window is None:
+            cls._create_window(self.widget.winfo_toplevel())
         
         # Position tooltip near the widget
         x = self.widget.winfo_rootx() + 20
         y = self.widget.winfo_rooty() + 20
         
-        # Create tooltip window
-        self.tooltip_window = tk.Toplevel(self.widget)
-        self.tooltip_window.wm_overrideredirect(True)  # Remove window decorations
-        self.tooltip_window.wm_geometry(f"+{x}+{y}")
-        
-        # Tooltip content with light yellow background
-        label = ttk.Label(
-            self.tooltip_window,
-            text=self.text,
-            background="lightyellow",
-            relief="solid",
-            borderwidth=1,
-            padding=5
-        )
-        label.pack()
+        cls._label.configure(text=self.text)
+        cls._window.wm_geometry(f"+{x}+{y}")
+        cls._window.deiconify()
+        cls._owner = self
     
     def hide_tooltip(self, event=None):
         """Hide the tooltip when mouse leaves widget."""
-        if self.tooltip_window:
-            self.tooltip_window.destroy()
-            self.tooltip_window = None
+        cls = type(self)
+        if cls._owner is self:
+            cls._window.withdraw()
+            cls._owner = None
 
 
 class DrugCalculatorApp:
@@ -122,8 +347,62 @@ class DrugCalculatorApp:
         except Exception as e:
             pass  # Icon is optional
 
-        # Initialize data storage
-        self.history = CalculationHistory()
+        # Shared fonts (created once instead of parsing a font tuple per widget)
+        self._font_title = tkfont.Font(family='Arial', size=16, weight='bold')
+        self._font_heading = tkfont.Font(family='Arial', size=14, weight='bold')
+        self._font_body = tkfont.Font(family='Arial', size=10)
+        self._font_small = tkfont.Font(family='Arial', size=9)
+        self._font_footer = tkfont.Font(family='Arial', size=8)
+        # Platform fixed-width font (Consolas/Menlo/DejaVu Sans Mono) instead of Courier
+        self._font_mono = tkfont.nametofont('TkFixedFont').copy()
+        self._font_mono.configure(size=10)
+        
+        # Data storage is loaded on first use (see the history property)
+        self._history = None
+        
+        # Pending history writes are flushed before the window closes
+        root.protocol('WM_DELETE_WINDOW', self._on_close)
+        
+        # Formatted history rows, keyed by id() of the entry dict. Timestamps
+        # can repeat (the Windows clock ticks every ~15.6 ms); the dicts stay
+        # alive in _history_cache, and these caches are cleared whenever
+        # entries are dropped, so an id is never reused while cached
+        self._history_row_cache = {}
+        
+        # Lowercased search text of history entries, keyed the same way
+        self._history_search_keys = {}
+        
+        # Details popup text (without its numbered header), keyed the same way
+        self._history_details_cache = {}
+        
+        # All saved calculations (newest first), reloaded only after changes
+        self._history_cache = None
+        self._search_after_id = None
+        
+        # Pending check for the result of background history writes
+        self._write_check_after_id = None
+        
+        # Last search result as (filter key, lowercase search, matches); a
+        # longer search with the same key only rescans those matches
+        self._history_filtered = None
+        
+        # Whole history in each drug-name order, as (history version, {sort: list})
+        self._history_sorted = (None, {})
+        
+        # Background history load: bumped on every change so a load that
+        # started before the change is thrown away instead of shown
+        self._history_version = 0
+        self._history_loader = None
+        self._history_loaded = None
+        self._rendered_view_key = None
+        
+        # Pending Calculate click, coalesced by _schedule_calc
+        self._calc_pending = None
+        self._calc_after_id = None
+        self._calc_buttons = {}
+        
+        # Results/details popups, built on first use and reused afterwards
+        self._protocol_windows = {}
         
         # Current calculator mode
         self.current_mode = None
@@ -133,18 +412,109 @@ class DrugCalculatorApp:
         self.main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # Configure grid weights
-        root.columnconfigure(0, weight=1)
-        root.rowconfigure(0, weight=1)
-        self.main_frame.columnconfigure(0, weight=1)
-        self.main_frame.rowconfigure(0, weight=1)
+        _grid_stretch(root)
+        _grid_stretch(self.main_frame)
+        
+        # Each screen is built on its first visit; navigation only shows/hides them
+        self._visible_frame = None
+        self._frames = {}
+        self._frame_builders = {
+            'welcome': self._build_welcome_frame,
+            'stock': self._build_stock_frame,
+            'dilution': self._build_dilution_frame,
+            'history': self._build_history_frame,
+        }
         
         # Show welcome screen
         self.show_welcome_screen()
     
-    def clear_frame(self):
-        """Clear all widgets from main frame."""
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
+    @property
+    def history(self):
+        """CalculationHistory, created (and read from disk) on first access."""
+        if self._history is None:
+            self._history = CalculationHistory()
+        return self._history
+    
+    def _save_calculation(self, **entry):
+        """
+        Add a calculation to history and to the cached history list.
+        
+        CalculationHistory queues the entry for its writer thread, so
+        this returns without touching the disk. If the history list is
+        loaded, the entry's table row is formatted now, so opening the
+        history later only inserts it. A failed write is reported by
+        _check_history_write once the writer thread gets to it.
+        
+        Parameters
+        ----------
+        **entry
+            Keyword arguments for CalculationHistory.add_calculation
+        """
+        saved = self.history.add_calculation(**entry)
+        self._history_version += 1
+        if self._history_cache is not None:
+            self._history_cache.insert(0, saved)
+            # Only cache the row while the list keeps the entry (and its id) alive
+            self._get_history_row(saved)
+        if self._write_check_after_id is None:
+            self._write_check_after_id = self.root.after(100, self._check_history_write)
+    
+    def _check_history_write(self):
+        """Report a failed background history write, polling until it finishes."""
+        if self.history.has_pending_writes():
+            self._write_check_after_id = self.root.after(100, self._check_history_write)
+            return
+        self._write_check_after_id = None
+        error = self.history.last_write_error()
+        if error is None:
+            return
+        # The store dropped the unsaved entries; reload the list from it
+        self._invalidate_history_cache()
+        if self._visible_frame == 'history':
+            self.update_history_display()
+        messagebox.showerror("Save Error", f"The calculation could not be saved to history: {error}")
+    
+    def _invalidate_history_cache(self):
+        """Forget the cached history list and everything derived from it."""
+        self._history_row_cache.clear()
+        self._history_search_keys.clear()
+        self._history_details_cache.clear()
+        self._history_cache = None
+        self._history_version += 1
+    
+    def _on_close(self):
+        """Finish pending history writes, then close the application."""
+        try:
+            if self._history is not None:
+                self._history.close()
+        except IOError as e:
+            messagebox.showerror("Save Error", f"Some calculations could not be saved to history: {e}")
+        finally:
+            self.root.destroy()
+    
+    def _show_frame(self, name):
+        """
+        Show one of the screens and hide the others.
+        
+        A screen is built the first time it is shown and kept afterwards,
+        so its inputs survive navigation.
+        
+        Parameters
+        ----------
+        name : str
+            Key of the screen in self._frames ("welcome", "stock",
+            "dilution" or "history")
+        """
+        if name == self._visible_frame:
+            return
+        if self._visible_frame is not None:
+            self._frames[self._visible_frame].grid_remove()
+        if name in self._frames:
+            self._frames[name].grid()
+        else:
+            # Builders grid their frame themselves
+            self._frames[name] = self._frame_builders[name]()
+        self._visible_frame = name
             
     def create_labeled_input(self, parent, row, label_text, tooltip_text=None, 
                             has_unit=False, unit_options=None, default_unit=None):
@@ -163,7 +533,7 @@ class DrugCalculatorApp:
             Tooltip text for info icon (if None, no icon is shown)
         has_unit : bool, default=False
             Whether to include a unit dropdown
-        unit_options : list, optional
+        unit_options : sequence of str, optional
             List of unit options for dropdown
         default_unit : str, optional
             Default selected unit
@@ -196,13 +566,8 @@ class DrugCalculatorApp:
         unit_var = None
         if has_unit:
             unit_var = tk.StringVar(value=default_unit or "")
-            unit_combo = ttk.Combobox(
-                parent,
-                textvariable=unit_var,
-                values=unit_options or [],
-                state="readonly",
-                width=8
-            )
+            unit_combo = ttk.OptionMenu(parent, unit_var, unit_var.get(), *(unit_options or []))
+            unit_combo.configure(width=6)
             unit_combo.grid(row=row, column=2, sticky=tk.W, padx=5, pady=5)
         
         # Return variables in a dictionary for easy access
@@ -215,17 +580,62 @@ class DrugCalculatorApp:
     
     def show_welcome_screen(self):
         """Display welcome screen with calculator selection buttons."""
-        self.clear_frame()
         self.current_mode = None
+        self._show_frame('welcome')
+        if self._history is None:
+            # Paint the window first, then read the history file
+            self._count_var.set("Total calculations saved: …")
+            self.root.after_idle(self._update_count_label)
+        else:
+            self._update_count_label()
+    
+    def _update_count_label(self):
+        """Refresh the welcome screen's saved-calculation counter."""
+        count = self.history.get_calculation_count()
+        self._count_var.set(f"Total calculations saved: {count}")
+    
+    def show_stock_calculator(self):
+        """Display stock solution calculator interface with input validation tooltips."""
+        self.current_mode = "stock"
+        self._show_frame('stock')
+    
+    def show_dilution_calculator(self):
+        """Display working solution dilution calculator interface."""
+        self.current_mode = "dilution"
+        self._show_frame('dilution')
+    
+    def show_history(self):
+        """Display calculation history with search and filtering."""
+        self.current_mode = "history"
+        self._show_frame('history')
+        
+        # The table survives navigation; redraw only if something changed
+        if self._history_view_key() != self._rendered_view_key:
+            self.update_history_display()
+    
+    def _history_view_key(self):
+        """Return what the history table's contents depend on."""
+        return (
+            self._history_version,
+            self.search_var.get(),
+            self.filter_var.get(),
+            self.sort_var.get(),
+        )
+    
+    def _build_welcome_frame(self):
+        """Build the welcome screen with calculator selection buttons."""
+        frame = tk.Frame(self.main_frame)
+        frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        _grid_stretch(frame)
         
         # Menu bar (Word-style, always visible box)
-        menubar = tk.Frame(self.main_frame, relief=tk.FLAT, bd=0)
+        menubar = tk.Frame(frame, relief=tk.FLAT, bd=0)
         menubar.grid(row=0, column=0, sticky=(tk.W, tk.N, tk.E), pady=(10,0))
         
         about_menu = tk.Label(
             menubar,
             text="About",
-            font=('Arial', 9),
+            font=self._font_small,
             cursor="hand2",
             relief=tk.RAISED,
             borderwidth=1,
@@ -237,82 +647,117 @@ class DrugCalculatorApp:
         
         # Main title
         subtitle = ttk.Label(
-            self.main_frame,
+            frame,
             text="Drug Concentration Calculator",
-            font=('Arial', 14, 'bold')
+            font=self._font_heading
         )
         subtitle.grid(row=1, column=0, pady=(15, 10))
         
         # Button frame
-        button_frame = ttk.Frame(self.main_frame)
+        button_frame = ttk.Frame(frame)
         button_frame.grid(row=2, column=0, pady=30)
         
         # Calculator buttons
-        stock_btn = ttk.Button(
-            button_frame,
-            text="Stock Solution Calculator\n(Powder → Stock)",
-            command=self.show_stock_calculator,
-            width=30
-        )
-        stock_btn.grid(row=0, column=0, pady=10)
-        
-        dilution_btn = ttk.Button(
-            button_frame,
-            text="Working Solution Calculator\n(Stock → Working)",
-            command=self.show_dilution_calculator,
-            width=30
-        )
-        dilution_btn.grid(row=1, column=0, pady=10)
-        
-        history_btn = ttk.Button(
-            button_frame,
-            text="View Calculation History",
-            command=self.show_history,
-            width=30
-        )
-        history_btn.grid(row=2, column=0, pady=10)
+        for row, (text, command_name) in enumerate(_WELCOME_BUTTONS):
+            ttk.Button(
+                button_frame,
+                text=text,
+                command=getattr(self, command_name),
+                width=30
+            ).grid(row=row, column=0, pady=10)
         
         # Footer
-        count = self.history.get_calculation_count()
-        calc_count = ttk.Label(
-            self.main_frame,
-            text=f"Total calculations saved: {count}",
-            font=('Arial', 9)
+        self._count_var = tk.StringVar()
+        self._count_label = ttk.Label(
+            frame,
+            textvariable=self._count_var,
+            font=self._font_small
         )
-        calc_count.grid(row=3, column=0, pady=(20, 5))
+        self._count_label.grid(row=3, column=0, pady=(20, 5))
         
         # Developer credit
         credit = ttk.Label(
-            self.main_frame,
+            frame,
             text="v2.1.1 • S. Strasser",
-            font=('Arial', 8),
+            font=self._font_footer,
             foreground='gray'
         )
         credit.grid(row=4, column=0, pady=(0, 10))
+        
+        return frame
     
-    def show_stock_calculator(self):
-        """Display stock solution calculator interface with input validation tooltips."""
-        self.clear_frame()
-        self.current_mode = "stock"
+    def _build_calculator_frame(self, title, subtitle):
+        """
+        Build the frame shared by both calculators: title, subtitle and an
+        empty input box.
         
-        # Title
-        title = ttk.Label(
-            self.main_frame,
-            text="Stock Solution Calculator",
-            font=('Arial', 16, 'bold')
-        )
-        title.grid(row=0, column=0, columnspan=3, pady=10)
+        Parameters
+        ----------
+        title : str
+            Screen title
+        subtitle : str
+            One-line description shown under the title
+            
+        Returns
+        -------
+        tuple of (tk.Frame, ttk.LabelFrame)
+            The screen frame and the box to put the input rows in
+        """
+        frame = tk.Frame(self.main_frame)
+        frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        _grid_stretch(frame)
         
-        subtitle = ttk.Label(
-            self.main_frame,
-            text="Calculate mass of powder needed for stock solution",
-            font=('Arial', 10)
+        ttk.Label(frame, text=title, font=self._font_title).grid(
+            row=0, column=0, columnspan=3, pady=10
+        )
+        ttk.Label(frame, text=subtitle, font=self._font_body).grid(
+            row=1, column=0, columnspan=3, pady=5
         )
-        subtitle.grid(row=1, column=0, columnspan=3, pady=5)
         
         # Input frame
-        input_frame = ttk.LabelFrame(self.main_frame, text="Input Parameters", padding="10")
+        input_frame = ttk.LabelFrame(frame, text="Input Parameters", padding="10")
         input_frame.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=10)
+        return frame, input_frame
+    
+    def _build_calculator_buttons(self, frame, mode):
+        """
+        Add the Calculate / Clear / Back button row and the footer.
+        
+        Parameters
+        ----------
+        frame : tk.Frame
+            Calculator screen from _build_calculator_frame
+        mode : str
+            'stock' or 'dilution'; selects what Calculate runs
+        """
+        btn_frame = ttk.Frame(frame)
+        btn_frame.grid(row=3, column=0, columnspan=3, pady=10)
+        
+        buttons = (
+            ("Calculate", lambda: self._schedule_calc(mode)),
+            ("Clear", self.clear_inputs),
+            ("Back to Menu", self.show_welcome_screen),
+        )
+        for column, (text, command) in enumerate(buttons):
+            button = ttk.Button(btn_frame, text=text, command=command)
+            button.grid(row=0, column=column, padx=5)
+            if column == 0:
+                self._calc_buttons[mode] = button
+        
+        # Footer
+        ttk.Label(
+            frame,
+            text="v2.1.1 • S. Strasser",
+            font=self._font_footer,
+            foreground='gray'
+        ).grid(row=4, column=0, columnspan=3, pady=(20, 5))
+    
+    def _build_stock_frame(self):
+        """Build the stock solution calculator screen with input validation tooltips."""
+        frame, input_frame = self._build_calculator_frame(
+            "Stock Solution Calculator",
+            "Calculate mass of powder needed for stock solution"
+        )
         
         # ========== ROW 0: Drug name (no tooltip needed) ==========
         ttk.Label(input_frame, text="Drug Name:").grid(row=0, column=0, sticky=tk.W, pady=5)
@@ -321,25 +766,16 @@ class DrugCalculatorApp:
             row=0, column=1, columnspan=2, sticky=(tk.W, tk.E), pady=5
         )
         
-        # ========== ROW 1: Molecular weight (WITH tooltip) ==========
-        # Create frame to hold label + info icon together
-        mw_label_frame = ttk.Frame(input_frame)
-        mw_label_frame.grid(row=1, column=0, sticky=tk.W, pady=5)
-        
-        ttk.Label(mw_label_frame, text="Molecular Weight (g/mol):").pack(side=tk.LEFT)
-        
-        # Info icon with tooltip
-        mw_info = ttk.Label(mw_label_frame, text=" ℹ️", foreground="blue", cursor="hand2")
-        mw_info.pack(side=tk.LEFT)
-        ToolTip(mw_info, "Use period (.) for decimal numbers")
+        # ========== ROW 1: Molecular weight (with tooltip) ==========
+        self.mw_var = self.create_labeled_input(
+            parent=input_frame,
+            row=1,
+            label_text="Molecular Weight (g/mol):",
+            tooltip_text="Use period (.) for decimal numbers"
+        )['value_var']
         
-        # Entry field
-        self.mw_var = tk.StringVar()
-        ttk.Entry(input_frame, textvariable=self.mw_var, width=15).grid(
-            row=1, column=1, sticky=tk.W, pady=5
-        )
-
         # Molecular weigth lookup
+        from gui_integration import MolecularWeightLookupWidget
         self.mw_lookup = MolecularWeightLookupWidget(
             input_frame,
             self.drug_name_var,  # Drug name entry (already exists)
@@ -348,57 +784,31 @@ class DrugCalculatorApp:
             column_start=2
         )
         
-        # ========== ROW 2: Target concentration (WITH tooltip) ==========
-        conc_label_frame = ttk.Frame(input_frame)
-        conc_label_frame.grid(row=2, column=0, sticky=tk.W, pady=5)
-        
-        ttk.Label(conc_label_frame, text="Target Concentration:").pack(side=tk.LEFT)
-        
-        conc_info = ttk.Label(conc_label_frame, text=" ℹ️", foreground="blue", cursor="hand2")
-        conc_info.pack(side=tk.LEFT)
-        ToolTip(conc_info, "Use period (.) for decimal numbers")
-        
-        # Entry field
-        self.conc_var = tk.StringVar()
-        conc_entry = ttk.Entry(input_frame, textvariable=self.conc_var, width=15)
-        conc_entry.grid(row=2, column=1, sticky=tk.W, pady=5)
-        
-        # Concentration unit dropdown
-        self.conc_unit_var = tk.StringVar(value="mM")
-        conc_units = ttk.Combobox(
-            input_frame,
-            textvariable=self.conc_unit_var,
-            values=["M", "mM", "µM", "nM"],
-            state="readonly",
-            width=8
+        # ========== ROW 2: Target concentration (with tooltip + unit) ==========
+        conc_fields = self.create_labeled_input(
+            parent=input_frame,
+            row=2,
+            label_text="Target Concentration:",
+            tooltip_text="Use period (.) for decimal numbers",
+            has_unit=True,
+            unit_options=_CONC_UNITS,
+            default_unit=_U_mM
         )
-        conc_units.grid(row=2, column=2, sticky=tk.W, padx=5, pady=5)
-        
-        # ========== ROW 3: Target volume (WITH tooltip) ==========
-        vol_label_frame = ttk.Frame(input_frame)
-        vol_label_frame.grid(row=3, column=0, sticky=tk.W, pady=5)
-        
-        ttk.Label(vol_label_frame, text="Target Volume:").pack(side=tk.LEFT)
-        
-        vol_info = ttk.Label(vol_label_frame, text=" ℹ️", foreground="blue", cursor="hand2")
-        vol_info.pack(side=tk.LEFT)
-        ToolTip(vol_info, "Use period (.) for decimal numbers")
-        
-        # Entry field
-        self.vol_var = tk.StringVar()
-        vol_entry = ttk.Entry(input_frame, textvariable=self.vol_var, width=15)
-        vol_entry.grid(row=3, column=1, sticky=tk.W, pady=5)
+        self.conc_var = conc_fields['value_var']
+        self.conc_unit_var = conc_fields['unit_var']
         
-        # Volume unit dropdown (default to µL as per your requirement)
-        self.vol_unit_var = tk.StringVar(value="µL")  # Changed default from "mL" to "µL"
-        vol_units = ttk.Combobox(
-            input_frame,
-            textvariable=self.vol_unit_var,
-            values=["L", "mL", "µL"],
-            state="readonly",
-            width=8
+        # ========== ROW 3: Target volume (with tooltip + unit) ==========
+        vol_fields = self.create_labeled_input(
+            parent=input_frame,
+            row=3,
+            label_text="Target Volume:",
+            tooltip_text="Use period (.) for decimal numbers",
+            has_unit=True,
+            unit_options=_VOL_UNITS,
+            default_unit=_V_uL
         )
-        vol_units.grid(row=3, column=2, sticky=tk.W, padx=5, pady=5)
+        self.vol_var = vol_fields['value_var']
+        self.vol_unit_var = vol_fields['unit_var']
         
         # ========== ROW 4: Solvent (no tooltip needed) ==========
         ttk.Label(input_frame, text="Solvent:").grid(row=4, column=0, sticky=tk.W, pady=5)
@@ -406,62 +816,25 @@ class DrugCalculatorApp:
         solvent_combo = ttk.Combobox(
             input_frame,
             textvariable=self.solvent_var,
-            values=["DMSO", "Water", "Ethanol", "PBS", "Media", "Other"],
+            values=_STOCK_SOLVENTS,
             width=27
         )
         solvent_combo.grid(row=4, column=1, columnspan=2, sticky=(tk.W, tk.E), pady=5)
         
-        # Button frame
-        btn_frame = ttk.Frame(self.main_frame)
-        btn_frame.grid(row=3, column=0, columnspan=3, pady=10)
-        
-        ttk.Button(btn_frame, text="Calculate", command=self.calculate_stock).grid(
-            row=0, column=0, padx=5
-        )
-        ttk.Button(btn_frame, text="Clear", command=self.clear_inputs).grid(
-            row=0, column=1, padx=5
-        )
-        ttk.Button(btn_frame, text="Back to Menu", command=self.show_welcome_screen).grid(
-            row=0, column=2, padx=5
-        )
-        
-        # Footer
-        footer = ttk.Label(
-            self.main_frame,
-            text="v2.1.1 • S. Strasser",
-            font=('Arial', 8),
-            foreground='gray'
-        )
-        footer.grid(row=4, column=0, columnspan=3, pady=(20, 5))
+        self._build_calculator_buttons(frame, 'stock')
+        return frame
     
-    def show_dilution_calculator(self):
-        """Display working solution dilution calculator interface."""
-        self.clear_frame()
-        self.current_mode = "dilution"
-        
-        # Title
-        title = ttk.Label(
-            self.main_frame,
-            text="Working Solution Calculator",
-            font=('Arial', 16, 'bold')
-        )
-        title.grid(row=0, column=0, columnspan=3, pady=10)
-        
-        subtitle = ttk.Label(
-            self.main_frame,
-            text="Dilute stock solution to working concentration",
-            font=('Arial', 10)
+    def _build_dilution_frame(self):
+        """Build the working solution dilution calculator screen."""
+        frame, input_frame = self._build_calculator_frame(
+            "Working Solution Calculator",
+            "Dilute stock solution to working concentration"
         )
-        subtitle.grid(row=1, column=0, columnspan=3, pady=5)
-        
-        # Input frame
-        input_frame = ttk.LabelFrame(self.main_frame, text="Input Parameters", padding="10")
-        input_frame.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=10)
         
        # ========== ROW 0: Drug name (no tooltip) ==========
         ttk.Label(input_frame, text="Drug Name:").grid(row=0, column=0, sticky=tk.W, pady=5)
-        self.drug_name_var = tk.StringVar()
-        ttk.Entry(input_frame, textvariable=self.drug_name_var, width=30).grid(
+        self.dilution_drug_name_var = tk.StringVar()
+        ttk.Entry(input_frame, textvariable=self.dilution_drug_name_var, width=30).grid(
             row=0, column=1, columnspan=2, sticky=(tk.W, tk.E), pady=5
         )
         
@@ -472,8 +845,8 @@ class DrugCalculatorApp:
             label_text="Stock Concentration:",
             tooltip_text="Use period (.) for decimal numbers",
             has_unit=True,
-            unit_options=["M", "mM", "µM", "nM"],
-            default_unit="mM"
+            unit_options=_CONC_UNITS,
+            default_unit=_U_mM
         )
         self.stock_conc_var = stock_conc_fields['value_var']
         self.stock_conc_unit_var = stock_conc_fields['unit_var']
@@ -485,8 +858,8 @@ class DrugCalculatorApp:
             label_text="Target Concentration:",
             tooltip_text="Use period (.) for decimal numbers",
             has_unit=True,
-            unit_options=["M", "mM", "µM", "nM"],
-            default_unit="µM"
+            unit_options=_CONC_UNITS,
+            default_unit=_U_uM
         )
         self.target_conc_var = target_conc_fields['value_var']
         self.target_conc_unit_var = target_conc_fields['unit_var']
@@ -498,119 +871,101 @@ class DrugCalculatorApp:
             label_text="Target Volume:",
             tooltip_text="Use period (.) for decimal numbers",
             has_unit=True,
-            unit_options=["L", "mL", "µL"],
-            default_unit="µL"
+            unit_options=_VOL_UNITS,
+            default_unit=_V_uL
         )
         self.target_vol_var = target_vol_fields['value_var']
-        self.vol_unit_var = target_vol_fields['unit_var']
+        self.target_vol_unit_var = target_vol_fields['unit_var']
         
         # ========== ROW 4: Solvent (no tooltip) ==========
         ttk.Label(input_frame, text="Solvent:").grid(row=4, column=0, sticky=tk.W, pady=5)
-        self.solvent_var = tk.StringVar()
+        self.dilution_solvent_var = tk.StringVar()
         solvent_combo = ttk.Combobox(
             input_frame,
-            textvariable=self.solvent_var,
-            values=["Media", "PBS", "Water", "DMSO", "Ethanol", "Other"],
+            textvariable=self.dilution_solvent_var,
+            values=_DIL_SOLVENTS,
             width=27
         )
         solvent_combo.grid(row=4, column=1, columnspan=2, sticky=(tk.W, tk.E), pady=5)
         
-   
-        
-        # Button frame
-        btn_frame = ttk.Frame(self.main_frame)
-        btn_frame.grid(row=3, column=0, columnspan=3, pady=10)
-        
-        ttk.Button(btn_frame, text="Calculate", command=self.calculate_dilution).grid(
-            row=0, column=0, padx=5
-        )
-        ttk.Button(btn_frame, text="Clear", command=self.clear_inputs).grid(
-            row=0, column=1, padx=5
-        )
-        ttk.Button(btn_frame, text="Back to Menu", command=self.show_welcome_screen).grid(
-            row=0, column=2, padx=5
-        )
-        
-        # Footer
-        footer = ttk.Label(
-            self.main_frame,
-            text="v2.1.1 • S. Strasser",
-            font=('Arial', 8),
-            foreground='gray'
-        )
-        footer.grid(row=4, column=0, columnspan=3, pady=(20, 5))
+        self._build_calculator_buttons(frame, 'dilution')
+        return frame
+    
+    def _schedule_calc(self, mode):
+        """
+        Queue a calculation, coalescing clicks that arrive within 50 ms.
         
+        Parameters
+        ----------
+        mode : str
+            'stock' or 'dilution'
+        """
+        self._calc_pending = mode
+        if self._calc_after_id is None:
+            self._calc_after_id = self.root.after(50, self._flush_calc)
+    
+    def _flush_calc(self):
+        """Run the most recently requested calculation with its button disabled."""
+        mode, self._calc_pending = self._calc_pending, None
+        self._calc_after_id = None
+        if mode is None:
+            return
         
+        button = self._calc_buttons.get(mode)
+        if button is not None:
+            button.state(['disabled'])
+        try:
+            if mode == 'stock':
+                self.calculate_stock()
+            else:
+                self.calculate_dilution()
+        finally:
+            if button is not None:
+                button.state(['!disabled'])
     
     def calculate_stock(self):
         """Perform stock solution calculation with input validation and formatted results."""
         try:
-            # ========== STEP 1: Get raw input values ==========
+            # ========== STEP 1: Validate drug name ==========
             drug_name = self.drug_name_var.get().strip()
-            mw_input = self.mw_var.get().strip()
-            conc_input = self.conc_var.get().strip()
-            vol_input = self.vol_var.get().strip()
-            
-            # ========== STEP 2: Validate drug name ==========
             if not drug_name:
                 messagebox.showerror("Input Error", "Please enter a drug name")
                 return
             
-            # ========== STEP 3: Validate molecular weight ==========
-            is_valid, _, error_msg = validate_decimal_input(mw_input)
-            if not is_valid:
-                messagebox.showerror("Input Error", f"Molecular Weight: {error_msg}")
-                return# Results frame
-            mw = float(mw_input)
-            
-            if mw <= 0:
-                messagebox.showerror("Input Error", "Molecular weight must be positive")
-                return
-            
-            # ========== STEP 4: Validate concentration ==========
-            is_valid, _, error_msg = validate_decimal_input(conc_input)
-            if not is_valid:
-                messagebox.showerror("Input Error", f"Target Concentration: {error_msg}")
+            # ========== STEP 2: Validate numeric inputs in one pass ==========
+            raw_values = [var.get() for var in (self.mw_var, self.conc_var, self.vol_var)]
+            try:
+                mw, conc, vol = _parse_positive_floats(
+                    (field, quantity, raw)
+                    for (field, quantity), raw in zip(_STOCK_NUMERIC_FIELDS, raw_values)
+                )
+            except _InputError as e:
+                messagebox.showerror("Input Error", str(e))
                 return
-            conc = float(conc_input)
             
-            if conc <= 0:
-                messagebox.showerror("Input Error", "Concentration must be positive")
-                return
-            
-            # ========== STEP 5: Validate volume ==========
-            is_valid, _, error_msg = validate_decimal_input(vol_input)
-            if not is_valid:
-                messagebox.showerror("Input Error", f"Target Volume: {error_msg}")
-                return
-            vol = float(vol_input)
-            
-            if vol <= 0:
-                messagebox.showerror("Input Error", "Volume must be positive")
-                return
-            
-            # ========== STEP 6: Get unit selections ==========
+            # ========== STEP 3: Get unit selections ==========
             conc_unit = self.conc_unit_var.get()
             vol_unit = self.vol_unit_var.get()
             solvent = self.solvent_var.get().strip()
             
-            # ========== STEP 7: Perform calculation ==========
-            result = calculate_stock_from_powder(mw, conc, vol, conc_unit, vol_unit)
+            # ========== STEP 4: Perform calculation ==========
+            result = dict(_cached_stock_from_powder(mw, conc, vol, conc_unit, vol_unit))
+            if has_non_finite(result):
+                messagebox.showerror("Calculation Error", "The inputs are too large to calculate with")
+                return
             
-            # ========== STEP 8: Display results - SIMPLIFIED ==========
-            content = f"""{'═'*60}
-STOCK SOLUTION
-{'═'*60}
-
-Drug:                {drug_name}
-Molecular Weight:    {format_number(mw)} g/mol
-Target:              {format_number(conc)} {conc_unit} in {format_number(vol)} {vol_unit}
-Solvent:             {solvent if solvent else 'Not specified'}
-
-{'─'*60}
-WEIGH:  {format_result_with_unit(result['mass_mg'], 'mg')}
-DISSOLVE IN:  {format_number(vol)} {vol_unit} {solvent if solvent else 'solvent'}
-{'─'*60}"""
+            # ========== STEP 5: Display results - SIMPLIFIED ==========
+            content = _STOCK_TEMPLATE.format_map({
+                'drug_name': drug_name,
+                'mw': format_number(mw),
+                'conc': format_number(conc),
+                'conc_unit': conc_unit,
+                'vol': format_number(vol),
+                'vol_unit': vol_unit,
+                'solvent': solvent if solvent else _NO_SOLVENT,
+                'mass': format_result_with_unit(result['mass_mg'], 'mg'),
+                'solvent_name': solvent if solvent else 'solvent',
+            })
             
             self.show_results_window(
                 title="Stock Solution Preparation",
@@ -618,7 +973,7 @@ DISSOLVE IN:  {format_number(vol)} {vol_unit} {solvent if solvent else 'solvent'
                 content=content
             )
             
-            # ========== STEP 9: Save to history ==========
+            # ========== STEP 6: Save to history ==========
             inputs = {
                 'molecular_weight': mw,
                 'target_concentration': conc,
@@ -627,7 +982,7 @@ DISSOLVE IN:  {format_number(vol)} {vol_unit} {solvent if solvent else 'solvent'
                 'volume_unit': vol_unit
             }
             
-            self.history.add_calculation(
+            self._save_calculation(
                 calculation_type="Stock from Powder",
                 drug_name=drug_name,
                 inputs=inputs,
@@ -641,72 +996,48 @@ DISSOLVE IN:  {format_number(vol)} {vol_unit} {solvent if solvent else 'solvent'
     def calculate_dilution(self):
         """Perform dilution calculation and display results."""
         try:
-            # Get inputs
-            drug_name = self.drug_name_var.get().strip()
-            stock_conc = float(self.stock_conc_var.get())
-            target_conc = float(self.target_conc_var.get())
-            target_vol = float(self.target_vol_var.get())
+            # Validate numeric inputs in one pass, before anything else is read
+            raw_values = [
+                var.get() for var in (self.stock_conc_var, self.target_conc_var, self.target_vol_var)
+            ]
+            try:
+                stock_conc, target_conc, target_vol = _parse_positive_floats(
+                    (field, quantity, raw)
+                    for (field, quantity), raw in zip(_DILUTION_NUMERIC_FIELDS, raw_values)
+                )
+            except _InputError as e:
+                messagebox.showerror("Input Error", str(e))
+                return
+            drug_name = self.dilution_drug_name_var.get().strip()
             stock_conc_unit = self.stock_conc_unit_var.get()
             target_conc_unit = self.target_conc_unit_var.get()
-            vol_unit = self.vol_unit_var.get()
-            solvent = self.solvent_var.get().strip()
-            
-            # Convert target concentration to stock concentration units
-            conversion_factors = {
-                ('M', 'M'): 1,
-                ('M', 'mM'): 1000,
-                ('M', 'µM'): 1000000,
-                ('M', 'nM'): 1000000000,
-                ('mM', 'M'): 0.001,
-                ('mM', 'mM'): 1,
-                ('mM', 'µM'): 1000,
-                ('mM', 'nM'): 1000000,
-                ('µM', 'M'): 0.000001,
-                ('µM', 'mM'): 0.001,
-                ('µM', 'µM'): 1,
-                ('µM', 'nM'): 1000,
-                ('nM', 'M'): 0.000000001,
-                ('nM', 'mM'): 0.000001,
-                ('nM', 'µM'): 0.001,
-                ('nM', 'nM'): 1
-            }
+            vol_unit = self.target_vol_unit_var.get()
+            solvent = self.dilution_solvent_var.get().strip()
             
-            # Convert target to stock units
-            conversion_key = (stock_conc_unit, target_conc_unit)
-            if conversion_key in conversion_factors:
-                target_conc_in_stock_units = target_conc / conversion_factors[conversion_key]
-            else:
+            # Convert target to stock units (one lookup + one multiply)
+            try:
+                target_conc_in_stock_units = target_conc * _CONC_FACTORS[target_conc_unit, stock_conc_unit]
+            except KeyError:
                 messagebox.showerror("Unit Error", "Unsupported unit combination")
                 return
             
-            # Validate inputs
-            is_valid, error_msg = validate_inputs(
-                concentration=stock_conc,
-                volume=target_vol
-            )
-            
-            if not is_valid:
-                messagebox.showerror("Input Error", error_msg)
-                return
-            
-            if target_conc <= 0:
-                messagebox.showerror("Input Error", "Target concentration must be positive")
-                return
-            
             if not drug_name:
                 messagebox.showwarning("Missing Input", "Please enter a drug name")
                 return
             
             # Calculate using converted target concentration
-            result = calculate_dilution(
+            result = dict(_cached_dilution(
                 stock_conc, target_conc_in_stock_units, target_vol,
                 stock_conc_unit, vol_unit
-            )
+            ))
             
             # Check for errors
             if result.get('error'):
                 messagebox.showerror("Calculation Error", result.get('message'))
                 return
+            if has_non_finite(result):
+                messagebox.showerror("Calculation Error", "The inputs are too large to calculate with")
+                return
             
             # Convert volumes to readable units
             stock_vol_raw = result['stock_volume']
@@ -715,20 +1046,22 @@ DISSOLVE IN:  {format_number(vol)} {vol_unit} {solvent if solvent else 'solvent'
             solvent_vol_converted, solvent_vol_unit = convert_to_readable_unit(solvent_vol_raw, vol_unit)
             
             # ========== Display results - SIMPLIFIED ==========
-            content = f"""{'═'*60}
-WORKING SOLUTION
-{'═'*60}
-
-Drug:                {drug_name}
-From Stock:          {format_number(stock_conc)} {stock_conc_unit}
-Target:              {format_number(target_conc)} {target_conc_unit} in {format_number(target_vol)} {vol_unit}
-Dilution Factor:     {format_number(result['dilution_factor'])}x
-Solvent:             {solvent if solvent else 'Not specified'}
-
-{'─'*60}
-TAKE:  {format_number(stock_vol_converted)} {stock_vol_unit} of stock
-ADD:   {format_number(solvent_vol_converted)} {solvent_vol_unit} of {solvent if solvent else 'solvent'}
-{'─'*60}"""
+            content = _DILUTION_TEMPLATE.format_map({
+                'drug_name': drug_name,
+                'stock_conc': format_number(stock_conc),
+                'stock_conc_unit': stock_conc_unit,
+                'target_conc': format_number(target_conc),
+                'target_conc_unit': target_conc_unit,
+                'target_vol': format_number(target_vol),
+                'vol_unit': vol_unit,
+                'dilution_factor': format_number(result['dilution_factor']),
+                'solvent': solvent if solvent else _NO_SOLVENT,
+                'stock_vol': format_number(stock_vol_converted),
+                'stock_vol_unit': stock_vol_unit,
+                'solvent_vol': format_number(solvent_vol_converted),
+                'solvent_vol_unit': solvent_vol_unit,
+                'solvent_name': solvent if solvent else 'solvent',
+            })
             
             self.show_results_window(
                 title="Working Solution Preparation",
@@ -746,7 +1079,7 @@ ADD:   {format_number(solvent_vol_converted)} {solvent_vol_unit} of {solvent if
                 'volume_unit': vol_unit
             }
             
-            self.history.add_calculation(
+            self._save_calculation(
                 calculation_type="Working from Stock",
                 drug_name=drug_name,
                 inputs=inputs,
@@ -754,8 +1087,6 @@ ADD:   {format_number(solvent_vol_converted)} {solvent_vol_unit} of {solvent if
                 solvent=solvent
             )
             
-        except ValueError:
-            messagebox.showerror("Input Error", "Please enter valid numerical values")
         except Exception as e:
             messagebox.showerror("Calculation Error", f"An error occurred: {str(e)}")
     
@@ -768,20 +1099,24 @@ ADD:   {format_number(solvent_vol_converted)} {solvent_vol_unit} of {solvent if
             self.vol_var.set("")
             self.solvent_var.set("")
         elif self.current_mode == "dilution":
-            self.drug_name_var.set("")
+            self.dilution_drug_name_var.set("")
             self.stock_conc_var.set("")
             self.target_conc_var.set("")
             self.target_vol_var.set("")
-            self.solvent_var.set("")
+            self.dilution_solvent_var.set("")
     
     def show_about_dialog(self):
         """Show the About dialog with application information."""
+        from gui_integration import AboutDialog
         AboutDialog(self.root)
     
     def show_results_window(self, title: str, drug_name: str, content: str):
         """
         Display calculation results in a popup window.
         
+        The popup is built on first use and then reused: later results
+        only replace its title and text before it is shown again.
+        
         Parameters
         ----------
         title : str
@@ -791,10 +1126,77 @@ ADD:   {format_number(solvent_vol_converted)} {solvent_vol_unit} of {solvent if
         content : str
             Formatted result text to display
         """
+        results_window = self._show_protocol_window(
+            'results', f"{title} - {drug_name}", title, content
+        )
+        
+        # Make it modal (stay on top)
+        results_window.grab_set()
+    
+    def _show_protocol_window(self, kind, window_title, heading, content):
+        """
+        Fill one of the reusable protocol popups and bring it to the front.
+        
+        Parameters
+        ----------
+        kind : str
+            'results' or 'details' (see _PROTOCOL_WINDOW_SIZES)
+        window_title : str
+            Text for the window's title bar
+        heading : str
+            Heading shown above the text
+        content : str
+            Protocol text to display (and copy)
+            
+        Returns
+        -------
+        tk.Toplevel
+            The shown popup
+        """
+        popup = self._protocol_windows.get(kind)
+        if popup is None:
+            popup = self._protocol_windows[kind] = self._build_protocol_window(kind)
+        
+        window = popup['window']
+        window.title(window_title)
+        popup['heading'].configure(text=heading)
+        popup['content'] = content
+        text = popup['text']
+        text.configure(state='normal')
+        text.delete(1.0, tk.END)
+        text.insert(1.0, content)
+        text.configure(state='disabled')  # Make read-only
+        
+        window.deiconify()
+        window.lift()
+        window.focus_set()
+        return window
+    
+    def _build_protocol_window(self, kind):
+        """
+        Create a hidden protocol popup (heading, text, Copy and Close).
+        
+        Parameters
+        ----------
+        kind : str
+            'results' or 'details' (see _PROTOCOL_WINDOW_SIZES)
+            
+        Returns
+        -------
+        dict
+            The popup's window, heading label, text widget and content
+        """
+        width, height, text_height, text_width = _PROTOCOL_WINDOW_SIZES[kind]
+        popup = {'content': ""}
+        
         # Create popup window
-        results_window = tk.Toplevel(self.root)
-        results_window.title(f"{title} - {drug_name}")
-        results_window.geometry("650x400")
+        window = tk.Toplevel(self.root)
+        window.withdraw()
+        
+        # Size and center up front (root is already mapped, so no layout flush needed)
+        x = (self.root.winfo_screenwidth() - width) // 2
+        y = (self.root.winfo_screenheight() - height) // 2
+        window.geometry(f'{width}x{height}+{x}+{y}')
         
         # add icon
         try:
@@ -807,48 +1209,56 @@ ADD:   {format_number(solvent_vol_converted)} {solvent_vol_unit} of {solvent if
                 icon_path = Path(__file__).parent / "icon.ico"
             
             if icon_path.exists():
-                results_window.iconbitmap(str(icon_path))
+                window.iconbitmap(str(icon_path))
         except Exception:
             pass
 
-        # Make it modal (stay on top)
-        results_window.transient(self.root)
-        results_window.grab_set()
+        window.transient(self.root)
+        
+        # Closing only hides the window so the next protocol can reuse it
+        def hide():
+            window.grab_release()
+            window.withdraw()
+        
+        window.protocol('WM_DELETE_WINDOW', hide)
         
         # Main frame
-        frame = ttk.Frame(results_window, padding="15")
+        frame = ttk.Frame(window, padding="15")
         frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # Configure grid
-        results_window.columnconfigure(0, weight=1)
-        results_window.rowconfigure(0, weight=1)
-        frame.columnconfigure(0, weight=1)
-        frame.rowconfigure(0, weight=1)
+        _grid_stretch(window)
+        _grid_stretch(frame, rows=(1,))
         
         # Title
-        title_label = ttk.Label(
+        heading = ttk.Label(
             frame,
-            text=title,
-            font=('Arial', 14, 'bold')
+            font=self._font_heading
         )
-        title_label.grid(row=0, column=0, pady=(0, 10))
+        heading.grid(row=0, column=0, pady=(0, 10))
         
-        # Results text (scrollable)
+        # Protocol text (scrollable)
         text_frame = ttk.Frame(frame)
         text_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        text_frame.columnconfigure(0, weight=1)
-        text_frame.rowconfigure(0, weight=1)
+        _grid_stretch(text_frame)
         
-        results_text = scrolledtext.ScrolledText(
+        from tkinter import scrolledtext
+        # Content is preformatted monospace, so skip wrapping and undo tracking
+        text = scrolledtext.ScrolledText(
             text_frame,
-            height=15,
-            width=70,
-            font=('Courier', 10),
-            wrap=tk.WORD
+            height=text_height,
+            width=text_width,
+            font=self._font_mono,
+            wrap=tk.NONE,
+            undo=False,
+            maxundo=0,
+            autoseparators=False,
+            state='disabled'
         )
-        results_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        results_text.insert(1.0, content)
-        results_text.configure(state='disabled')  # Make read-only
+        text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        x_scroll = ttk.Scrollbar(text_frame, orient=tk.HORIZONTAL, command=text.xview)
+        x_scroll.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        text.configure(xscrollcommand=x_scroll.set)
         
         # Button frame
         btn_frame = ttk.Frame(frame)
@@ -856,9 +1266,9 @@ ADD:   {format_number(solvent_vol_converted)} {solvent_vol_unit} of {solvent if
         
         # Copy to clipboard button
         def copy_to_clipboard():
-            results_window.clipboard_clear()
-            results_window.clipboard_append(content)
-            messagebox.showinfo("Copied", "Protocol copied to clipboard!", parent=results_window)
+            window.clipboard_clear()
+            window.clipboard_append(popup['content'])
+            messagebox.showinfo("Copied", "Protocol copied to clipboard!", parent=window)
         
         ttk.Button(
             btn_frame,
@@ -870,38 +1280,33 @@ ADD:   {format_number(solvent_vol_converted)} {solvent_vol_unit} of {solvent if
         ttk.Button(
             btn_frame,
             text="Close",
-            command=results_window.destroy
+            command=hide
         ).grid(row=0, column=1, padx=5)
         
-        # Center the window
-        results_window.update_idletasks()
-        width = results_window.winfo_width()
-        height = results_window.winfo_height()
-        x = (results_window.winfo_screenwidth() // 2) - (width // 2)
-        y = (results_window.winfo_screenheight() // 2) - (height // 2)
-        results_window.geometry(f'{width}x{height}+{x}+{y}')
+        popup.update(window=window, heading=heading, text=text)
+        return popup
     
-    def show_history(self):
-        """Display calculation history with search and filtering."""
-        self.clear_frame()
-        self.current_mode = "history"
+    def _build_history_frame(self):
+        """Build the calculation history screen with search and filtering."""
+        frame = tk.Frame(self.main_frame)
+        frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # Title
         title = ttk.Label(
-            self.main_frame,
+            frame,
             text="Calculation History",
-            font=('Arial', 16, 'bold')
+            font=self._font_title
         )
         title.grid(row=0, column=0, columnspan=2, pady=10)
         
         # Control frame (search + filter + sort)
-        control_frame = ttk.Frame(self.main_frame)
+        control_frame = ttk.Frame(frame)
         control_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
         
         # Search bar
         ttk.Label(control_frame, text="Search:").grid(row=0, column=0, padx=5)
         self.search_var = tk.StringVar()
-        self.search_var.trace('w', lambda *args: self.update_history_display())
+        self.search_var.trace('w', lambda *args: self._schedule_history_search())
         search_entry = ttk.Entry(control_frame, textvariable=self.search_var, width=30)
         search_entry.grid(row=0, column=1, padx=5)
         
@@ -932,19 +1337,23 @@ ADD:   {format_number(solvent_vol_converted)} {solvent_vol_unit} of {solvent if
         sort_combo.bind('<<ComboboxSelected>>', lambda e: self.update_history_display())
         
         # History display frame
-        history_frame = ttk.Frame(self.main_frame)
+        history_frame = ttk.Frame(frame)
         history_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=10)
         
         # Create Treeview with scrollbar
         tree_scroll = ttk.Scrollbar(history_frame)
         tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self._history_scroll = tree_scroll
+        self._history_rows = []
+        self._history_rendered = 0
+        self._history_page_after_id = None
         
         columns = ("#", "Date", "Drug", "Type", "Value", "Solvent")
         self.history_tree = ttk.Treeview(
             history_frame,
             columns=columns,
             show='headings',
-            yscrollcommand=tree_scroll.set,
+            yscrollcommand=self._on_history_scroll,
             selectmode='browse'
         )
         tree_scroll.config(command=self.history_tree.yview)
@@ -974,7 +1383,7 @@ ADD:   {format_number(solvent_vol_converted)} {solvent_vol_unit} of {solvent if
         self.history_tree.bind('<Double-1>', self.show_calculation_details)
         
         # Button frame
-        btn_frame = ttk.Frame(self.main_frame)
+        btn_frame = ttk.Frame(frame)
         btn_frame.grid(row=3, column=0, columnspan=2, pady=10)
         
         ttk.Button(btn_frame, text="View Details", command=lambda: self.show_calculation_details(None)).grid(
@@ -988,290 +1397,342 @@ ADD:   {format_number(solvent_vol_converted)} {solvent_vol_unit} of {solvent if
         )
         
         # Configure grid weights
-        self.main_frame.rowconfigure(2, weight=1)
-        self.main_frame.columnconfigure(0, weight=1)
+        _grid_stretch(frame, rows=(2,))
         
         # Footer
         footer = ttk.Label(
-            self.main_frame,
+            frame,
             text="v2.1.1 • S. Strasser",
-            font=('Arial', 8),
+            font=self._font_footer,
             foreground='gray'
         )
         footer.grid(row=4, column=0, columnspan=2, pady=(10, 5))
         
-        # Initial display
+        return frame
+    
+    def _schedule_history_search(self):
+        """Refresh the history table once typing in the search box pauses."""
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+        self._search_after_id = self.root.after(300, self._run_history_search)
+    
+    def _run_history_search(self):
+        """Debounced search callback."""
+        self._search_after_id = None
         self.update_history_display()
     
     def update_history_display(self):
         """Update history display based on search and filter criteria."""
-        # Clear current display
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
-        
-        # Get all calculations
-        all_calculations = self.history.get_all_calculations()
-        
-        # Apply search filter
-        search_term = self.search_var.get().lower()
-        if search_term:
-            all_calculations = [
-                calc for calc in all_calculations
-                if search_term in calc['drug_name'].lower() or
-                   search_term in calc.get('solvent', '').lower()
-            ]
+        # This redraw already uses the current search text
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+            self._search_after_id = None
+        
+        # Render only onto a visible screen; show_history catches up later
+        if self._visible_frame != 'history':
+            self._rendered_view_key = None
+            return
         
-        # Apply type filter
-        filter_type = self.filter_var.get()
-        if filter_type == "Stock Solutions":
-            all_calculations = [calc for calc in all_calculations if calc['calculation_type'] == "Stock from Powder"]
-        elif filter_type == "Working Solutions":
-            all_calculations = [calc for calc in all_calculations if calc['calculation_type'] == "Working from Stock"]
+        # Clear current display (single Tcl call instead of one per row)
+        children = self.history_tree.get_children()
+        if children:
+            self.history_tree.delete(*children)
         
-        # Store for access in details view
-        self.current_calculations = all_calculations
+        # Load from disk only after a change; otherwise filter in memory
+        self._rendered_view_key = None
+        if self._history_cache is None:
+            self._start_history_load()
+            return
         
-        # Apply sorting
-        sorted_calcs = all_calculations.copy()
+        filter_type = self.filter_var.get()
         sort_by = self.sort_var.get()
+        search = self.search_var.get().lower()
+        filter_key = (self._history_version, filter_type, sort_by)
+        
+        # Typing extends the search, so usually only the previous matches
+        # can still match and the full history need not be rescanned
+        previous = self._history_filtered
+        if previous is not None and previous[0] == filter_key and search.startswith(previous[1]):
+            entries = previous[2]
+        else:
+            entries = self._history_in_order(sort_by)
+        all_calculations = filter_calculations(
+            entries,
+            calculation_type=_HISTORY_FILTER_TYPES.get(filter_type),
+            search=search,
+            search_keys=self._history_search_keys
+        )
+        self._history_filtered = (filter_key, search, all_calculations)
+        
+        # Populate the first page; more are added as the user scrolls down.
+        # Kept in display order so the details view can index it directly
+        self._history_rows = all_calculations
+        self._history_rendered = 0
+        self._render_history_page()
+        self._rendered_view_key = self._history_view_key()
+    
+    def _history_in_order(self, sort_by):
+        """
+        Return all loaded history entries in the given display order.
         
-        if sort_by == "Date (newest first)":
-            sorted_calcs.sort(key=lambda x: x['timestamp'], reverse=True)
-        elif sort_by == "Date (oldest first)":
-            sorted_calcs.sort(key=lambda x: x['timestamp'])
-        elif sort_by == "Drug name (A-Z)":
-            sorted_calcs.sort(key=lambda x: x['drug_name'].lower())
-        elif sort_by == "Drug name (Z-A)":
-            sorted_calcs.sort(key=lambda x: x['drug_name'].lower(), reverse=True)
-        
-        # Populate list with alternating colors
-        for i, calc in enumerate(sorted_calcs, 1):
-            date = calc['timestamp'].split('T')[0]
-            drug = calc['drug_name']
-            calc_type = "Stock" if calc['calculation_type'] == "Stock from Powder" else "Working"
-            solvent = calc.get('solvent', 'N/A')
-            
-            # Format the value column based on type - WITH BACKWARD COMPATIBILITY
-            inputs = calc['inputs']
-            if calc['calculation_type'] == "Stock from Powder":
-                conc = format_number(inputs.get('target_concentration', 0))
-                vol = format_number(inputs.get('target_volume', 0))
-                conc_unit = inputs.get('concentration_unit', '?')
-                vol_unit = inputs.get('volume_unit', '?')
-                value = f"{conc} {conc_unit} in {vol} {vol_unit}"
-            else:  # Working from Stock
-                stock_conc = format_number(inputs.get('stock_concentration', 0))
-                target_conc = format_number(inputs.get('target_concentration', 0))
-                target_vol = format_number(inputs.get('target_volume', 0))
-                
-                # Get units with backward compatibility
-                stock_unit = inputs.get('stock_concentration_unit', inputs.get('concentration_unit', '?'))
-                target_unit = inputs.get('target_concentration_unit', inputs.get('concentration_unit', '?'))
-                vol_unit = inputs.get('volume_unit', '?')
-                
-                # Display format to match stock solution: "5 µM in 1000 µL"
-                value = f"{target_conc} {target_unit} in {target_vol} {vol_unit}"
+        Filtering keeps order, so the history is sorted here once per
+        change instead of sorting the matches on every keystroke.
+        
+        Parameters
+        ----------
+        sort_by : str
+            Current value of the "Sort by" combobox
             
-            # Alternate row colors
-            tag = 'evenrow' if i % 2 == 0 else 'oddrow'
+        Returns
+        -------
+        iterable of dict
+            Calculation entries in display order
+        """
+        entries = self._history_cache  # newest first
+        if sort_by == "Date (oldest first)":
+            return reversed(entries)
+        reverse = _HISTORY_NAME_SORTS.get(sort_by)
+        if reverse is None:
+            return entries
+        
+        version, orders = self._history_sorted
+        if version != self._history_version:
+            orders = {}
+            self._history_sorted = (self._history_version, orders)
+        if sort_by not in orders:
+            # Lowercase each name once; the list's C-level __getitem__ is the key
+            names = [calc['drug_name'].lower() for calc in entries]
+            order = sorted(range(len(entries)), key=names.__getitem__, reverse=reverse)
+            orders[sort_by] = [entries[i] for i in order]
+        return orders[sort_by]
+    
+    def _start_history_load(self):
+        """Read history on a worker thread while the table shows a placeholder."""
+        self._history_rows = []
+        self._history_rendered = 0
+        self.history_tree.insert('', tk.END, values=("", "Loading…"))
+        if self._history_loader is not None:
+            return
+        
+        version = self._history_version
+        history = self.history  # create the store here, not on the worker
+        
+        # Only the file read runs on the worker; rows are formatted (and the
+        # GUI's caches written) on the Tk thread when the page is rendered
+        def load():
+            try:
+                calculations = history.get_all_calculations()
+                self._history_loaded = (version, calculations)
+            except Exception as e:
+                self._history_loaded = (version, e)
+        
+        self._history_loader = threading.Thread(target=load, daemon=True)
+        self._history_loader.start()
+        self.root.after(50, self._poll_history_load)
+    
+    def _poll_history_load(self):
+        """Hand a finished background load to the table (Tk calls stay on the main thread)."""
+        if self._history_loader.is_alive():
+            self.root.after(50, self._poll_history_load)
+            return
+        
+        self._history_loader = None
+        version, loaded = self._history_loaded
+        self._history_loaded = None
+        if isinstance(loaded, Exception):
+            # Remove the "Loading…" placeholder row
+            children = self.history_tree.get_children()
+            if children:
+                self.history_tree.delete(*children)
+            messagebox.showerror("History Error", f"Could not load history: {loaded}")
+            return
+        if version == self._history_version:
+            self._history_cache = loaded
+        self.update_history_display()
+    
+    def _render_history_page(self):
+        """Append the next page of history rows to the Treeview."""
+        start = self._history_rendered
+        stop = min(start + _HISTORY_PAGE_SIZE, len(self._history_rows))
+        
+        # Bind loop invariants to locals once
+        insert = self.history_tree.insert
+        get_row = self._get_history_row
+        rows = self._history_rows
+        
+        # Populate list with alternating colors; the item id is the row number
+        for i in range(start + 1, stop + 1):
+            insert('', tk.END, iid=i, values=(i,) + get_row(rows[i - 1]), tags=_ROW_TAGS[i % 2])
+        self._history_rendered = stop
+    
+    def _on_history_scroll(self, first, last):
+        """Update the scrollbar and load another page near the bottom."""
+        self._history_scroll.set(first, last)
+        if (float(last) > 0.9 and self._history_page_after_id is None
+                and self._history_rendered < len(self._history_rows)):
+            # Scroll events arrive in bursts; load at most one page per frame
+            self._history_page_after_id = self.root.after(16, self._load_next_history_page)
+    
+    def _load_next_history_page(self):
+        """Debounced page load scheduled by _on_history_scroll."""
+        self._history_page_after_id = None
+        self._render_history_page()
+    
+    def _get_history_row(self, calc):
+        """
+        Return the formatted Treeview columns for one calculation.
+        
+        Rows are memoized by entry identity, so re-opening or re-filtering
+        the history only formats entries that were added since the last
+        render.
+        
+        Parameters
+        ----------
+        calc : dict
+            Calculation entry from history
             
-            # Insert into tree with tag
-            self.history_tree.insert('', tk.END, values=(i, date, drug, calc_type, value, solvent), tags=(tag,))
+        Returns
+        -------
+        tuple
+            (date, drug, type, value, solvent) display strings
+        """
+        key = id(calc)
+        row = self._history_row_cache.get(key)
+        if row is not None:
+            return row
+        
+        date = calc['timestamp'][:10]  # ISO date part, no split() list
+        drug = calc['drug_name']
+        is_stock = calc['calculation_type'] == "Stock from Powder"
+        calc_type = "Stock" if is_stock else "Working"
+        solvent = calc.get('solvent', 'N/A')
+        
+        # Format the value column based on type - WITH BACKWARD COMPATIBILITY
+        # Both types display as "5 µM in 1000 µL"; only the unit key differs
+        inputs = calc['inputs']
+        if is_stock:
+            conc_unit = inputs.get('concentration_unit', '?')
+        else:  # Working from Stock
+            conc_unit = inputs.get('target_concentration_unit', inputs.get('concentration_unit', '?'))
+        value = _HISTORY_VALUE_TEMPLATE.format_map({
+            'conc': format_number(inputs.get('target_concentration', 0)),
+            'conc_unit': conc_unit,
+            'vol': format_number(inputs.get('target_volume', 0)),
+            'vol_unit': inputs.get('volume_unit', '?'),
+        })
+        
+        row = (date, drug, calc_type, value, solvent)
+        self._history_row_cache[key] = row
+        return row
     
     def show_calculation_details(self, event):
         """Show detailed view of selected calculation in popup window."""
-        
+        # Nothing to show while history is still loading
+        if not self._history_rows:
+            return
         
         # Get selected item
         selection = self.history_tree.selection()
         if not selection:
             return
         
-        # Get the index
-        item = self.history_tree.item(selection[0])
-        values = item['values']
-        display_num = values[0]
-        
-        # Find the actual calculation
-        sorted_calcs = self.current_calculations.copy()
-        sort_by = self.sort_var.get()
-        
-        if sort_by == "Date (newest first)":
-            sorted_calcs.sort(key=lambda x: x['timestamp'], reverse=True)
-        elif sort_by == "Date (oldest first)":
-            sorted_calcs.sort(key=lambda x: x['timestamp'])
-        elif sort_by == "Drug name (A-Z)":
-            sorted_calcs.sort(key=lambda x: x['drug_name'].lower())
-        elif sort_by == "Drug name (Z-A)":
-            sorted_calcs.sort(key=lambda x: x['drug_name'].lower(), reverse=True)
-        
-        calc = sorted_calcs[display_num - 1]
-        
-        # Create popup window
-        details_window = tk.Toplevel(self.root)
-        details_window.title(f"{calc['calculation_type']} - {calc['drug_name']}")
-        details_window.geometry("700x450")
+        # The item id is the row number; rows are stored in display order
+        display_num = int(selection[0])
+        calc = self._history_rows[display_num - 1]
         
-        # Add icon
-        try:
-            import sys
-            from pathlib import Path
-            
-            if getattr(sys, 'frozen', False):
-                icon_path = Path(sys._MEIPASS) / "icon.ico"
-            else:
-                icon_path = Path(__file__).parent / "icon.ico"
-            
-            if icon_path.exists():
-                details_window.iconbitmap(str(icon_path))
-        except Exception:
-            pass
-        
-        # Make it modal but don't grab yet (causes issues)
-        details_window.transient(self.root)
-        details_window.focus_set()  # Give it focus
-        
-        # Main frame
-        frame = ttk.Frame(details_window, padding="15")
-        frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        
-        # Configure grid
-        details_window.columnconfigure(0, weight=1)
-        details_window.rowconfigure(0, weight=1)
-        frame.columnconfigure(0, weight=1)
-        frame.rowconfigure(1, weight=1)
-        
-        # Title
-        title_label = ttk.Label(
-            frame,
-            text=f"Calculation #{display_num}: {calc['drug_name']}",
-            font=('Arial', 14, 'bold')
+        drug_name = calc['drug_name']
+        header = _DETAILS_HEADER_TEMPLATE.format_map({
+            'display_num': display_num,
+            'timestamp': calc['timestamp'][:10],
+            'drug_name': drug_name,
+        })
+        
+        self._show_protocol_window(
+            'details',
+            f"{calc['calculation_type']} - {drug_name}",
+            f"Calculation #{display_num}: {drug_name}",
+            header + self._get_details_body(calc)
         )
-        title_label.grid(row=0, column=0, pady=(0, 10))
+    
+    def _get_details_body(self, calc):
+        """
+        Return the details protocol text for one calculation.
         
-        # Details text
-        text_frame = ttk.Frame(frame)
-        text_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        text_frame.columnconfigure(0, weight=1)
-        text_frame.rowconfigure(0, weight=1)
+        The text does not depend on the row's position, so it is memoized
+        per entry like the table rows; only the numbered header is
+        rebuilt each time a row is opened.
         
-        details_text = scrolledtext.ScrolledText(
-            text_frame,
-            height=18,
-            width=80,
-            font=('Courier', 10),
-            wrap=tk.WORD
-        )
-        details_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        Parameters
+        ----------
+        calc : dict
+            Calculation entry from history
+            
+        Returns
+        -------
+        str
+            Protocol text shown below the details header
+        """
+        key = id(calc)
+        body = self._history_details_cache.get(key)
+        if body is not None:
+            return body
         
         # Format the content - SIMPLIFIED VERSION WITH BACKWARD COMPATIBILITY
-        timestamp = calc['timestamp'].split('T')[0]
         drug_name = calc['drug_name']
         calc_type = calc['calculation_type']
-        solvent = calc.get('solvent', 'Not specified')
+        solvent = calc.get('solvent', _NO_SOLVENT)
         inputs = calc['inputs']
         results = calc['results']
         
-        content = f"""{'═'*70}
-#{display_num} │ {timestamp} │ {drug_name}
-{'═'*70}
-
-"""
-        
         if calc_type == "Stock from Powder":
-            mw = format_number(inputs.get('molecular_weight', 0))
-            conc = format_number(inputs.get('target_concentration', 0))
-            vol = format_number(inputs.get('target_volume', 0))
-            conc_unit = inputs.get('concentration_unit', '?')
-            vol_unit = inputs.get('volume_unit', '?')
-            mass_mg = format_number(results.get('mass_mg', 0))
-            
-            content += f"""STOCK SOLUTION
-
-Drug:                {drug_name}
-Molecular Weight:    {mw} g/mol
-Target:              {conc} {conc_unit} in {vol} {vol_unit}
-Solvent:             {solvent}
-
-{'─'*70}
-WEIGH:  {mass_mg} mg
-DISSOLVE IN:  {vol} {vol_unit} of {solvent}
-{'─'*70}
-"""
+            body = _STOCK_DETAILS_TEMPLATE.format_map({
+                'drug_name': drug_name,
+                'mw': format_number(inputs.get('molecular_weight', 0)),
+                'conc': format_number(inputs.get('target_concentration', 0)),
+                'conc_unit': inputs.get('concentration_unit', '?'),
+                'vol': format_number(inputs.get('target_volume', 0)),
+                'vol_unit': inputs.get('volume_unit', '?'),
+                'solvent': solvent,
+                'mass_mg': format_number(results.get('mass_mg', 0)),
+            })
         else:  # Working from Stock
-            stock_conc = format_number(inputs.get('stock_concentration', 0))
-            target_conc = format_number(inputs.get('target_concentration', 0))
-            target_vol = format_number(inputs.get('target_volume', 0))
-            
-            # Get units with backward compatibility
-            stock_conc_unit = inputs.get('stock_concentration_unit', inputs.get('concentration_unit', '?'))
-            target_conc_unit = inputs.get('target_concentration_unit', inputs.get('concentration_unit', '?'))
-            vol_unit = inputs.get('volume_unit', '?')
-            
-            # Smart unit conversion for volumes
-            stock_vol_raw = results.get('stock_volume', 0)
-            solvent_vol_raw = results.get('solvent_volume', 0)
-            
             # Convert to readable units
-            stock_vol_converted, stock_vol_unit = convert_to_readable_unit(stock_vol_raw, vol_unit)
-            solvent_vol_converted, solvent_vol_unit = convert_to_readable_unit(solvent_vol_raw, vol_unit)
-            
-            stock_vol = format_number(stock_vol_converted)
-            solvent_vol = format_number(solvent_vol_converted)
-            dilution = format_number(results.get('dilution_factor', 0))
+            stock_vol_converted, stock_vol_unit = convert_to_readable_unit(
+                results.get('stock_volume', 0), inputs.get('volume_unit', '?')
+            )
+            solvent_vol_converted, solvent_vol_unit = convert_to_readable_unit(
+                results.get('solvent_volume', 0), inputs.get('volume_unit', '?')
+            )
             
-            content += f"""WORKING SOLUTION
-
-Drug:                {drug_name}
-From Stock:          {stock_conc} {stock_conc_unit}
-Target:              {target_conc} {target_conc_unit} in {target_vol} {vol_unit}
-Dilution Factor:     {dilution}x
-Solvent:             {solvent}
-
-{'─'*70}
-TAKE:  {stock_vol} {stock_vol_unit} of stock
-ADD:   {solvent_vol} {solvent_vol_unit} of {solvent}
-{'─'*70}
-"""
-        
-        details_text.insert(1.0, content)
-        details_text.configure(state='disabled')
-        
-        # Button frame
-        btn_frame = ttk.Frame(frame)
-        btn_frame.grid(row=2, column=0, pady=(10, 0))
-        
-        # Copy to clipboard button
-        def copy_to_clipboard():
-            details_window.clipboard_clear()
-            details_window.clipboard_append(content)
-            messagebox.showinfo("Copied", "Protocol copied to clipboard!", parent=details_window)
-        
-        ttk.Button(
-            btn_frame,
-            text="Copy Protocol",
-            command=copy_to_clipboard
-        ).grid(row=0, column=0, padx=5)
-        
-        # Close button
-        ttk.Button(
-            btn_frame,
-            text="Close",
-            command=details_window.destroy
-        ).grid(row=0, column=1, padx=5)
-        
-        # Center the window
-        details_window.update_idletasks()
-        width = details_window.winfo_width()
-        height = details_window.winfo_height()
-        x = (details_window.winfo_screenwidth() // 2) - (width // 2)
-        y = (details_window.winfo_screenheight() // 2) - (height // 2)
-        details_window.geometry(f'{width}x{height}+{x}+{y}')
+            body = _DILUTION_DETAILS_TEMPLATE.format_map({
+                'drug_name': drug_name,
+                'stock_conc': format_number(inputs.get('stock_concentration', 0)),
+                # Units with backward compatibility
+                'stock_conc_unit': inputs.get('stock_concentration_unit', inputs.get('concentration_unit', '?')),
+                'target_conc': format_number(inputs.get('target_concentration', 0)),
+                'target_conc_unit': inputs.get('target_concentration_unit', inputs.get('concentration_unit', '?')),
+                'target_vol': format_number(inputs.get('target_volume', 0)),
+                'vol_unit': inputs.get('volume_unit', '?'),
+                'dilution': format_number(results.get('dilution_factor', 0)),
+                'solvent': solvent,
+                'stock_vol': format_number(stock_vol_converted),
+                'stock_vol_unit': stock_vol_unit,
+                'solvent_vol': format_number(solvent_vol_converted),
+                'solvent_vol_unit': solvent_vol_unit,
+            })
+        
+        self._history_details_cache[key] = body
+        return body
     
     def clear_history(self):
         """Clear all calculation history after confirmation."""
         if messagebox.askyesno("Confirm Clear", "Are you sure you want to delete all calculation history?"):
-            self.history.clear_all()
+            try:
+                self.history.clear_history()
+            except IOError as e:
+                messagebox.showerror("History Error", f"Could not clear history: {e}")
+                return
+            self._invalidate_history_cache()
             self.update_history_display()
             messagebox.showinfo("History Cleared", "All calculations have been deleted")
 
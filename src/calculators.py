@@ -8,6 +8,22 @@ preparations in laboratory settings.
 from typing import Dict, Optional
 
 
+# Factors to convert concentration to Molarity (M)
+_CONC_TO_M = {
+    "M": 1,
+    "mM": 1e-3,
+    "µM": 1e-6,
+    "nM": 1e-9
+}
+
+# Factors to convert volume to Liters (L)
+_VOL_TO_L = {
+    "L": 1,
+    "mL": 1e-3,
+    "µL": 1e-6
+}
+
+
 def calculate_stock_from_powder(
     molecular_weight: float,
     target_concentration: float,
@@ -39,6 +55,11 @@ def calculate_stock_from_powder(
         - 'mass_g': Mass to weigh in grams
         - 'volume': Volume of solvent needed
         
+    Raises
+    ------
+    ValueError
+        If either unit is not one of the supported units
+        
     Notes
     -----
     Formula: mass (g) = (concentration × volume × MW) / 1000
@@ -50,23 +71,15 @@ def calculate_stock_from_powder(
     >>> print(f"Weigh {result['mass_mg']:.2f} mg")
     Weigh 4.66 mg
     """
-    # Convert concentration to Molarity (M)
-    concentration_conversion = {
-        "M": 1,
-        "mM": 1e-3,
-        "µM": 1e-6,
-        "nM": 1e-9
-    }
-    
-    # Convert volume to Liters (L)
-    volume_conversion = {
-        "L": 1,
-        "mL": 1e-3,
-        "µL": 1e-6
-    }
-    
-    concentration_M = target_concentration * concentration_conversion[concentration_unit]
-    volume_L = target_volume * volume_conversion[volume_unit]
+    # Convert concentration to Molarity (M) and volume to Liters (L)
+    try:
+        concentration_M = target_concentration * _CONC_TO_M[concentration_unit]
+    except KeyError:
+        raise ValueError(f"Unsupported concentration unit: {concentration_unit}")
+    try:
+        volume_L = target_volume * _VOL_TO_L[volume_unit]
+    except KeyError:
+        raise ValueError(f"Unsupported volume unit: {volume_unit}")
     
     # Calculate mass in grams: mass = concentration (mol/L) × volume (L) × MW (g/mol)
     mass_g = concentration_M * volume_L * molecular_weight
@@ -1,21 +1,93 @@
 """
 Drug Dosage Calculator - Data storage functionality.
 
-This module handles saving and loading calculation history to/from JSON files.
+This module handles saving and loading calculation history to/from an
+append-only JSON Lines file (one calculation per line).
 """
 
 import json
+import math
+import os
+import queue
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional
+
+# orjson is optional: it serializes and parses entries several times faster
+# than the standard library. Both write strict JSON (no Infinity/NaN), so a
+# file written by either one reads back the same with the other.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _non_finite_to_none(name: str) -> None:
+    """Read Infinity/NaN, which strict JSON lacks, as null (orjson writes null)."""
+    return None
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize one history entry to a single line of JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, allow_nan=False)
+
+
+def _loads(line: str) -> Any:
+    """
+    Parse one history line.
+    
+    Lines with Infinity/NaN, written by older versions through the
+    standard library, are rejected by orjson and fall back to json,
+    which reads those values as null.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(line)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(line, parse_constant=_non_finite_to_none)
+
+
+def has_non_finite(value: Any) -> bool:
+    """
+    Check whether a number anywhere inside a value is inf or nan.
+    
+    JSON cannot store such numbers, and the GUI uses the same check to
+    catch calculator results that overflowed.
+    
+    Parameters
+    ----------
+    value : any
+        A number, or a dict, list or tuple to search recursively
+        
+    Returns
+    -------
+    bool
+        True if any float inside value is not finite
+    """
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(has_non_finite(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(has_non_finite(item) for item in value)
+    return False
 
 
 class CalculationHistory:
     """
     Manage calculation history storage and retrieval.
     
-    Calculations are stored as JSON in the data/ directory.
+    Calculations are stored as JSON Lines in the data/ directory, so saving
+    one appends one line instead of rewriting the whole file.
     Each entry includes timestamp, calculation type, inputs, and results.
+    
+    New entries are written by a background thread. The file is read
+    once, on the first query; after that, queries are answered from an
+    in-memory copy that add_calculation and clear_history keep current.
     """
     
     def __init__(self, data_dir: str = "data"):
@@ -29,51 +101,157 @@ class CalculationHistory:
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
-        self.history_file = self.data_dir / "calculation_history.json"
+        self.history_file = self.data_dir / "calculation_history.jsonl"
+        legacy_file = self.data_dir / "calculation_history.json"
+        
+        # Guards the in-memory state below. It is only held briefly, never
+        # across file writes, so adds on the Tk thread do not wait for disk
+        self._lock = threading.RLock()
         
-        # Create file if it doesn't exist
+        # Guards the history file and the append handle during writes
+        self._file_lock = threading.RLock()
+        
+        # Entries waiting to be written, drained by a daemon writer thread.
+        # _pending_writes counts queued and in-progress groups; _idle is
+        # notified when it drops to zero. _enqueue_count never goes down
+        self._write_queue = queue.Queue()
+        self._pending_writes = 0
+        self._enqueue_count = 0
+        self._idle = threading.Condition(self._lock)
+        
+        # Append handle kept open by the writer; reopened after a rewrite
+        self._append_file = None
+        self._writer = None
+        self._write_error = None
+        
+        # All entries, oldest first; read from disk on first use and then
+        # kept up to date, so queries never re-parse the file
+        self._entries = None
+        
+        # Create file if it doesn't exist, carrying over a pre-JSONL history
         if not self.history_file.exists():
-            self._save_history([])
+            self._save_history(self._load_legacy_history(legacy_file))
+            if legacy_file.exists():
+                legacy_file.replace(legacy_file.with_suffix('.json.bak'))
     
     def _save_history(self, history: List[Dict[str, Any]]) -> None:
         """
-        Save history list to JSON file.
+        Rewrite the history file with the given entries.
+        
+        The entries go to a temporary file that then replaces the history
+        in one step, so a crash mid-write leaves the old file intact.
         
         Parameters
         ----------
         history : list of dict
             List of calculation entries to save
         """
+        with self._file_lock:
+            self._close_append_file()
+            tmp_file = self.history_file.with_suffix('.jsonl.tmp')
+            try:
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    f.writelines(_dumps(entry) + '\n' for entry in history)
+                os.replace(tmp_file, self.history_file)
+            except Exception as e:
+                raise IOError(f"Failed to save history: {e}")
+    
+    def _append_history(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Append entries to the end of the history file.
+        
+        The file stays open between calls, so each write costs no open()
+        or close(); it is flushed so readers see the new lines at once.
+        If a crash left the last line without its newline, one is added
+        first, so the new entries do not run into the torn line.
+        
+        Parameters
+        ----------
+        entries : list of dict
+            New calculation entries, oldest first
+        """
         try:
-            with open(self.history_file, 'w') as f:
-                json.dump(history, f, indent=2)
+            if self._append_file is None:
+                self._append_file = open(self.history_file, 'a', encoding='utf-8')
+                if not self._ends_with_newline():
+                    self._append_file.write('\n')
+            self._append_file.writelines(_dumps(entry) + '\n' for entry in entries)
+            self._append_file.flush()
         except Exception as e:
+            self._close_append_file()
             raise IOError(f"Failed to save history: {e}")
     
+    def _ends_with_newline(self) -> bool:
+        """Return True if the history file is empty or ends with a newline."""
+        with open(self.history_file, 'rb') as f:
+            if f.seek(0, os.SEEK_END) == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+    
+    def _close_append_file(self) -> None:
+        """Close the persistent append handle, if one is open."""
+        if self._append_file is not None:
+            try:
+                self._append_file.close()
+            finally:
+                self._append_file = None
+    
     def _load_history(self) -> List[Dict[str, Any]]:
         """
-        Load history from JSON file.
+        Load history from the JSON Lines file.
+        
+        Lines are decoded one at a time, so a line cut short inside a
+        multi-byte character (e.g. the µ of µL) is skipped like any other
+        corrupted line instead of failing the whole read.
         
         Returns
         -------
         list of dict
             List of all saved calculations
         """
+        history = []
         try:
-            with open(self.history_file, 'r') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            # If file is corrupted, start fresh
-            return []
+            with open(self.history_file, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        history.append(_loads(line.decode('utf-8')))
+                    except (UnicodeDecodeError, json.JSONDecodeError):
+                        # Skip a corrupted line (e.g. a write cut short) but keep the rest
+                        continue
         except Exception as e:
             raise IOError(f"Failed to load history: {e}")
+        return history
+    
+    @staticmethod
+    def _load_legacy_history(legacy_file: Path) -> List[Dict[str, Any]]:
+        """
+        Read a history saved by older versions as a single JSON array.
+        
+        Parameters
+        ----------
+        legacy_file : Path
+            Path of the old calculation_history.json
+            
+        Returns
+        -------
+        list of dict
+            The saved calculations, or an empty list if there are none
+        """
+        try:
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                return json.load(f, parse_constant=_non_finite_to_none)
+        except (OSError, json.JSONDecodeError):
+            return []
     
     def add_calculation(self, 
                        calculation_type: str,
                        drug_name: str,
                        inputs: Dict[str, Any],
                        results: Dict[str, Any],
-                       solvent: str = "") -> None:
+                       solvent: str = "") -> Dict[str, Any]:
         """
         Add a new calculation to history.
         
@@ -89,8 +267,19 @@ class CalculationHistory:
             Calculated results
         solvent : str, optional
             Solvent used for the solution
+            
+        Returns
+        -------
+        dict
+            The stored entry, including its timestamp
+            
+        Raises
+        ------
+        ValueError
+            If inputs or results contain inf or nan, which JSON cannot store
         """
-        history = self._load_history()
+        if has_non_finite(inputs) or has_non_finite(results):
+            raise ValueError("Calculation contains an infinite or undefined number and cannot be saved")
         
         entry = {
             'timestamp': datetime.now().isoformat(),
@@ -101,8 +290,151 @@ class CalculationHistory:
             'results': results
         }
         
-        history.append(entry)
-        self._save_history(history)
+        with self._lock:
+            if self._entries is not None:
+                self._entries.append(entry)
+            self._enqueue([entry])
+        return entry
+    
+    def _enqueue(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Hand entries to the writer thread, starting it on first use.
+        
+        Parameters
+        ----------
+        entries : list of dict
+            Entries to append, oldest first
+        """
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+                self._writer.start()
+            self._pending_writes += 1
+            self._enqueue_count += 1
+            self._write_queue.put(entries)
+    
+    def _writer_loop(self) -> None:
+        """
+        Write queued entries to disk, one file append per batch.
+        
+        Entries that arrive while a write is in progress are picked up
+        together by the next one.
+        """
+        while True:
+            groups = [self._write_queue.get()]
+            while True:
+                try:
+                    groups.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            entries = [entry for group in groups for entry in group]
+            try:
+                with self._file_lock:
+                    self._append_history(entries)
+            except IOError as e:
+                with self._lock:
+                    # Forget the unsaved entries so queries match the file
+                    if self._entries is not None:
+                        failed = {id(entry) for entry in entries}
+                        self._entries = [entry for entry in self._entries if id(entry) not in failed]
+                    self._write_error = e
+            finally:
+                with self._lock:
+                    self._pending_writes -= len(groups)
+                    if not self._pending_writes:
+                        self._idle.notify_all()
+    
+    def _wait_for_writes(self) -> None:
+        """Wait, holding the lock, until no write is queued or in progress."""
+        while self._pending_writes:
+            self._idle.wait()
+    
+    def flush(self) -> None:
+        """
+        Wait until every added calculation has been written to disk.
+        
+        Raises
+        ------
+        IOError
+            If a background write failed since the last flush
+        """
+        with self._lock:
+            self._wait_for_writes()
+            error, self._write_error = self._write_error, None
+        if error is not None:
+            raise error
+    
+    def has_pending_writes(self) -> bool:
+        """
+        Return True while added calculations are still waiting to be written.
+        
+        Returns
+        -------
+        bool
+            Whether the writer thread has queued or in-progress work
+        """
+        with self._lock:
+            return self._pending_writes > 0
+    
+    def last_write_error(self) -> Optional[IOError]:
+        """
+        Return the error of a failed background write, if any, and clear it.
+        
+        Does not wait for queued writes; check has_pending_writes() first
+        to know whether the latest additions have been attempted. The
+        calculations of a failed write are dropped from the history.
+        
+        Returns
+        -------
+        IOError or None
+            The write error, or None if every finished write succeeded
+        """
+        with self._lock:
+            error, self._write_error = self._write_error, None
+        return error
+    
+    def close(self) -> None:
+        """
+        Write any queued calculations and release the history file.
+        
+        The instance stays usable; a later add reopens the file.
+        """
+        self.flush()
+        with self._file_lock:
+            self._close_append_file()
+    
+    def _cached_entries(self) -> List[Dict[str, Any]]:
+        """
+        Return the in-memory history, reading the file on first use.
+        
+        Callers must not modify the returned list. Other threads may append
+        to it, and a failed write replaces it, so read its length or copy
+        it under the lock.
+        
+        Returns
+        -------
+        list of dict
+            All calculation entries, oldest first
+        """
+        while True:
+            with self._lock:
+                if self._entries is not None:
+                    return self._entries
+                # Queued adds are not in the file yet, so let them land first.
+                # Write errors are left for flush() / last_write_error().
+                self._wait_for_writes()
+                enqueue_count = self._enqueue_count
+            
+            # Read without the lock, so adds on other threads do not wait
+            with self._file_lock:
+                history = self._load_history()
+            
+            with self._lock:
+                # An add queued during the read may be missing from it; if
+                # so, wait for its write and read again
+                if self._entries is None and self._enqueue_count == enqueue_count:
+                    self._entries = history
     
     def get_all_calculations(self) -> List[Dict[str, Any]]:
         """
@@ -113,9 +445,10 @@ class CalculationHistory:
         list of dict
             All calculation entries, ordered by timestamp (newest first)
         """
-        history = self._load_history()
-        # Return in reverse order (newest first)
-        return history[::-1]
+        entries = self._cached_entries()
+        with self._lock:
+            # Return in reverse order (newest first)
+            return entries[::-1]
     
     def clear_history(self) -> None:
         """
@@ -123,23 +456,93 @@ class CalculationHistory:
         
         This creates a backup before clearing.
         """
-        history = self._load_history()
-        if history:
-            # Create backup
-            backup_file = self.data_dir / f"history_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(backup_file, 'w') as f:
-                json.dump(history, f, indent=2)
-        
-        # Clear current history
-        self._save_history([])
+        self.flush()
+        with self._lock:
+            # Holding the lock keeps new adds out until the file is cleared
+            self._wait_for_writes()
+            with self._file_lock:
+                history = self._load_history()
+                if history:
+                    # Create backup
+                    backup_file = self.data_dir / f"history_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+                    with open(backup_file, 'w') as f:
+                        json.dump(history, f, indent=2)
+                
+                # Clear current history
+                self._save_history([])
+            self._entries = []
     
     def get_calculation_count(self) -> int:
         """
         Get total number of saved calculations.
         
+        Reads the file only if no query has loaded it yet.
+        
         Returns
         -------
         int
             Number of calculations in history
         """
-        return len(self._load_history())
+        entries = self._cached_entries()
+        with self._lock:
+            return len(entries)
+
+
+def filter_calculations(entries: Iterable[Dict[str, Any]],
+                        calculation_type: Optional[str] = None,
+                        search: str = "",
+                        search_keys: Optional[Dict[int, str]] = None) -> List[Dict[str, Any]]:
+    """
+    Filter calculation entries by type and search text, keeping their order.
+    
+    Both filters run in a single lazy pass over the entries.
+    
+    Parameters
+    ----------
+    entries : iterable of dict
+        Calculation entries, e.g. an already loaded history list
+    calculation_type : str, optional
+        Only keep entries of this type ("Stock from Powder" or
+        "Working from Stock")
+    search : str, default=""
+        Case-insensitive text to match against drug name or solvent
+    search_keys : dict, optional
+        Cache of each entry's lowercased search text, keyed by id() of the
+        entry (timestamps can repeat). Filled in as entries are scanned, so
+        passing the same dict to later calls skips str.lower() for entries
+        seen before. The caller must keep the entries alive while the dict
+        is in use, and clear it when entries are dropped.
+        
+    Returns
+    -------
+    list of dict
+        Matching calculation entries
+    """
+    if calculation_type is not None:
+        entries = (calc for calc in entries if calc['calculation_type'] == calculation_type)
+    if search:
+        search = search.lower()
+        if search_keys is None:
+            entries = (
+                calc for calc in entries
+                if search in calc['drug_name'].lower() or
+                   search in calc.get('solvent', '').lower()
+            )
+        else:
+            entries = (calc for calc in entries if search in _search_text(calc, search_keys))
+    return list(entries)
+
+
+def _search_text(calc: Dict[str, Any], search_keys: Dict[int, str]) -> str:
+    """
+    Return an entry's lowercased drug name and solvent, computing it once.
+    
+    The two fields are joined by a NUL character, so a search can match
+    within either field but never across both.
+    """
+    key = id(calc)
+    text = search_keys.get(key)
+    if text is None:
+        text = f"{calc['drug_name']}\0{calc.get('solvent', '')}".lower()
+        search_keys[key] = text
+    return text
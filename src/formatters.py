@@ -12,7 +12,14 @@ Author: Steffi
 Created: 2024-11-21
 """
 
+import re
+from functools import lru_cache
 
+# Plain decimal number, optionally signed and with an exponent ("5", "-.5", "1.2e-3")
+_DECIMAL_RE = re.compile(r'[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?')
+
+
+@lru_cache(maxsize=1024)
 def format_number(value, unit=None):
     """
     Format a number with appropriate decimal precision.
@@ -41,7 +48,9 @@ def format_number(value, unit=None):
     >>> format_number(499.123, 'µl')
     '499'
     >>> format_number(0.00123, 'mg')
-    '0.0012'
+    '0.00123'
+    >>> format_number(1.5e-10, 'mg')
+    '1.5e-10'
     
     Notes
     -----
@@ -49,34 +58,39 @@ def format_number(value, unit=None):
     - P1000 (100-1000 µl): ±1 µl → round to integer for values >100
     - P200 (20-200 µl): ±0.2 µl → 1 decimal for values 10-100
     - P20 (2-20 µl): ±0.02 µl → 2 decimals for values <10
+    
+    Results are memoized: the function is pure, and the same few values
+    are formatted repeatedly by the result popups and history table.
     """
     # Handle zero or None
     if value is None or value == 0:
         return "0"
     
-    abs_value = abs(value)
+    # Whole numbers ("500.0" µl) print the same in every branch below
+    if float(value).is_integer():
+        return str(int(value))
     
-    # For very small numbers (< 0.01), use scientific notation or 4 decimals
+    # Sign flip instead of abs(): dosages are almost always positive
+    abs_value = value if value > 0 else -value
+    
+    # For very small numbers (< 0.01), use scientific notation or 4 decimals.
+    # %g already drops trailing zeros; stripping again would also eat the
+    # zeros of an exponent ("1.5e-10" → "1.5e-1")
     if abs_value < 0.01:
         # Keep 4 significant figures
-        formatted = f"{value:.4g}"
-    # Small values (< 10): 2 decimal places
-    elif abs_value < 10:
-        formatted = f"{value:.2f}"
-    # Medium values (10-100): 1 decimal place
-    elif abs_value < 100:
-        formatted = f"{value:.1f}"
-    # Large values (≥ 100): no decimal places
-    else:
-        formatted = f"{value:.0f}"
+        return f"{value:.4g}"
+    
+    # Large values (≥ 100): no decimal places, so nothing to strip
+    if abs_value >= 100:
+        return f"{value:.0f}"
+    
+    # Small values (< 10): 2 decimal places; medium values (10-100): 1
+    formatted = f"{value:.2f}" if abs_value < 10 else f"{value:.1f}"
     
     # Remove trailing zeros and unnecessary decimal points
     # "5.20" → "5.2" → done
     # "5.00" → "5.0" → "5"
-    if '.' in formatted:
-        formatted = formatted.rstrip('0').rstrip('.')
-    
-    return formatted
+    return formatted.rstrip('0').rstrip('.')
 
 
 def validate_decimal_input(input_string):
@@ -123,18 +137,18 @@ def validate_decimal_input(input_string):
             "Please use period (.) for decimals, not comma (,)"
         )
     
-    # Try to convert to float to check if it's a valid number
-    try:
-        float(input_string)
+    # Check the number's shape with the precompiled pattern; unlike float(),
+    # this also rejects "inf", "nan" and "1_000"
+    if _DECIMAL_RE.fullmatch(input_string):
         return (True, input_string, "")
-    except ValueError:
-        return (
-            False,
-            input_string,
-            "Please enter a valid number"
-        )
+    return (
+        False,
+        input_string,
+        "Please enter a valid number"
+    )
 
 
+@lru_cache(maxsize=1024)
 def format_result_with_unit(value, unit):
     """
     Format a number with its unit, using appropriate precision.
@@ -158,9 +172,10 @@ def format_result_with_unit(value, unit):
     >>> format_result_with_unit(499.0, 'µl')
     '499 µl'
     """
-    formatted_number = format_number(value, unit)
-    return f"{formatted_number} {unit}"
+    # Plain concatenation: both parts are already strings
+    return format_number(value, unit) + " " + unit
 
+@lru_cache(maxsize=256)
 def convert_to_readable_unit(value, current_unit):
     """
     Convert volume to more readable unit if too small.
@@ -186,13 +201,6 @@ def convert_to_readable_unit(value, current_unit):
     >>> convert_to_readable_unit(500, 'µL')
     (500, 'µL')
     """
-    # Conversion factors
-    conversions = {
-        'L': {'mL': 1000, 'µL': 1000000},
-        'mL': {'µL': 1000, 'L': 0.001},
-        'µL': {'mL': 0.001, 'L': 0.000001}
-    }
-    
     # If value is very small, convert to smaller unit
     if current_unit == 'L' and value < 0.001:  # Less than 1 mL
         if value < 0.000001:  # Less than 1 µL
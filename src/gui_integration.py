@@ -140,29 +140,35 @@ class MolecularWeightLookupWidget:
         text : str
             Tooltip text to display
         """
+        # The tooltip window is built on first hover, then hidden and re-shown
         def on_enter(event):
-            tooltip = tk.Toplevel()
-            tooltip.wm_overrideredirect(True)
-            tooltip.wm_geometry(f"+{event.x_root+10}+{event.y_root+10}")
-            
-            label = tk.Label(
-                tooltip,
-                text=text,
-                background="#ffffe0",
-                relief=tk.SOLID,
-                borderwidth=1,
-                font=("Arial", 8),
-                padx=5,
-                pady=3
-            )
-            label.pack()
+            tooltip = getattr(widget, 'tooltip', None)
+            if tooltip is None:
+                tooltip = tk.Toplevel(widget)
+                tooltip.withdraw()
+                tooltip.wm_overrideredirect(True)
+                
+                label = tk.Label(
+                    tooltip,
+                    text=text,
+                    background="#ffffe0",
+                    relief=tk.SOLID,
+                    borderwidth=1,
+                    font=("Arial", 8),
+                    padx=5,
+                    pady=3
+                )
+                label.pack()
+                
+                widget.tooltip = tooltip
             
-            widget.tooltip = tooltip
+            tooltip.wm_geometry(f"+{event.x_root+10}+{event.y_root+10}")
+            tooltip.deiconify()
         
         def on_leave(event):
-            if hasattr(widget, 'tooltip'):
-                widget.tooltip.destroy()
-                del widget.tooltip
+            tooltip = getattr(widget, 'tooltip', None)
+            if tooltip is not None:
+                tooltip.withdraw()
         
         widget.bind("<Enter>", on_enter)
         widget.bind("<Leave>", on_leave)
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the calculation history storage.
+
+Covers the JSON Lines history file: migration from the old JSON array
+file, tolerance of corrupted lines, round trips through the background
+writer, backups made by clear_history and reporting of failed writes.
+
+Run with: python -m pytest tests/test_data_storage.py
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path (matches main.py pattern)
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from data_storage import CalculationHistory
+
+
+def _add(history, drug_name, concentration=10.0):
+    """Add a stock calculation with the given drug name to history."""
+    return history.add_calculation(
+        calculation_type='stock',
+        drug_name=drug_name,
+        inputs={'concentration': concentration},
+        results={'volume': 2 * concentration},
+        solvent='DMSO',
+    )
+
+
+def test_migrates_legacy_json_array(tmp_path):
+    """The old JSON array file is converted to JSON Lines and kept as .bak."""
+    legacy = [
+        {'timestamp': '2025-01-01T10:00:00', 'type': 'stock', 'drug_name': 'Cisplatin'},
+        {'timestamp': '2025-01-02T10:00:00', 'type': 'dilution', 'drug_name': 'Etoposide'},
+    ]
+    (tmp_path / "calculation_history.json").write_text(json.dumps(legacy), encoding='utf-8')
+    
+    history = CalculationHistory(str(tmp_path))
+    
+    assert not (tmp_path / "calculation_history.json").exists()
+    assert (tmp_path / "calculation_history.json.bak").exists()
+    lines = (tmp_path / "calculation_history.jsonl").read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == legacy
+    assert [c['drug_name'] for c in history.get_all_calculations()] == ['Etoposide', 'Cisplatin']
+
+
+def test_skips_corrupted_line(tmp_path):
+    """A line cut short by a crash is skipped; the other entries still load."""
+    good = {'timestamp': '2025-01-01T10:00:00', 'type': 'stock', 'drug_name': 'Cisplatin'}
+    (tmp_path / "calculation_history.jsonl").write_text(
+        json.dumps(good) + "\n" + '{"timestamp": "2025-01-02T1' + "\n",
+        encoding='utf-8',
+    )
+    
+    history = CalculationHistory(str(tmp_path))
+    
+    assert history.get_all_calculations() == [good]
+    assert history.get_calculation_count() == 1
+
+
+def test_skips_line_cut_inside_multibyte_character(tmp_path):
+    """A line torn inside the UTF-8 bytes of 'µ' does not hide the others."""
+    good = {'timestamp': '2025-01-01T10:00:00', 'type': 'stock', 'unit': 'µL'}
+    torn = json.dumps({'unit': 'µL'}, ensure_ascii=False).encode('utf-8')
+    torn = torn[:torn.index('µ'.encode('utf-8')) + 1]
+    (tmp_path / "calculation_history.jsonl").write_bytes(
+        json.dumps(good, ensure_ascii=False).encode('utf-8') + b"\n" + torn
+    )
+    
+    history = CalculationHistory(str(tmp_path))
+    
+    assert history.get_all_calculations() == [good]
+
+
+def test_add_after_torn_last_line(tmp_path):
+    """A new entry is not glued onto a last line left without its newline."""
+    good = {'timestamp': '2025-01-01T10:00:00', 'type': 'stock', 'drug_name': 'Cisplatin'}
+    (tmp_path / "calculation_history.jsonl").write_text(
+        json.dumps(good) + "\n" + '{"timestamp": "2025-01-02T1',
+        encoding='utf-8',
+    )
+    
+    history = CalculationHistory(str(tmp_path))
+    saved = _add(history, 'Etoposide')
+    history.close()
+    
+    reloaded = CalculationHistory(str(tmp_path))
+    assert reloaded.get_all_calculations() == [saved, good]
+
+
+def test_add_flush_reload_round_trip(tmp_path):
+    """Calculations written by one instance are read back by the next."""
+    history = CalculationHistory(str(tmp_path))
+    first = _add(history, 'Cisplatin')
+    second = _add(history, 'Etoposide', concentration=2.5)
+    history.flush()
+    history.close()
+    
+    reloaded = CalculationHistory(str(tmp_path))
+    
+    assert reloaded.get_all_calculations() == [second, first]
+    assert reloaded.get_calculation_count() == 2
+
+
+def test_add_rejects_non_finite_values(tmp_path):
+    """Infinite or NaN values are refused instead of being written."""
+    history = CalculationHistory(str(tmp_path))
+    
+    with pytest.raises(ValueError):
+        _add(history, 'Cisplatin', concentration=float('inf'))
+    
+    assert history.get_calculation_count() == 0
+
+
+def test_clear_history_writes_backup(tmp_path):
+    """Clearing empties the history and keeps the old entries in a backup."""
+    history = CalculationHistory(str(tmp_path))
+    saved = _add(history, 'Cisplatin')
+    
+    history.clear_history()
+    
+    assert history.get_calculation_count() == 0
+    assert (tmp_path / "calculation_history.jsonl").read_text(encoding='utf-8') == ""
+    backups = list(tmp_path.glob("history_backup_*.json"))
+    assert len(backups) == 1
+    assert json.loads(backups[0].read_text()) == [saved]
+
+
+def test_failed_write_is_reported(tmp_path, monkeypatch):
+    """A failed background write is reported once and its entry is dropped."""
+    history = CalculationHistory(str(tmp_path))
+    _add(history, 'Cisplatin')
+    history.flush()
+    
+    def fail(entries):
+        raise IOError("disk full")
+    
+    monkeypatch.setattr(history, '_append_history', fail)
+    _add(history, 'Etoposide')
+    while history.has_pending_writes():
+        time.sleep(0.01)
+    
+    error = history.last_write_error()
+    assert isinstance(error, IOError)
+    assert history.last_write_error() is None
+    assert history.get_calculation_count() == 1
+    
+    _add(history, 'Paclitaxel')
+    with pytest.raises(IOError):
+        history.flush()
+    history.flush()
+    assert history.last_write_error() is None
+    assert [c['drug_name'] for c in history.get_all_calculations()] == ['Cisplatin']
+    lines = (tmp_path / "calculation_history.jsonl").read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 1
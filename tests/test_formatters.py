@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the number formatting and input validation helpers.
+
+Run with: python -m pytest tests/test_formatters.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src directory to path (matches main.py pattern)
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from formatters import format_number, format_result_with_unit, validate_decimal_input
+
+
+@pytest.mark.parametrize("value, unit, expected", [
+    # Docstring examples
+    (5.234567, 'µl', '5.23'),
+    (25.789, 'µl', '25.8'),
+    (499.123, 'µl', '499'),
+    (0.00123, 'mg', '0.00123'),
+    # Trailing zeros and whole numbers
+    (5.2, 'µl', '5.2'),
+    (5.0, 'µl', '5'),
+    (500.0, 'µl', '500'),
+    (0, 'µl', '0'),
+    (None, 'µl', '0'),
+    # Negative values use the same precision as positive ones
+    (-5.234, 'µl', '-5.23'),
+    (-499.6, 'µl', '-500'),
+])
+def test_format_number(value, unit, expected):
+    """Values are rounded to the precision of their magnitude."""
+    assert format_number(value, unit) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    (1.5e-10, '1.5e-10'),
+    (-1.5e-10, '-1.5e-10'),
+    (2e-20, '2e-20'),
+    (1.234e-5, '1.234e-05'),
+])
+def test_format_number_keeps_exponent_zeros(value, expected):
+    """Zeros in the exponent are not stripped as trailing zeros."""
+    assert format_number(value) == expected
+
+
+def test_format_result_with_unit():
+    """The formatted number and its unit are joined by one space."""
+    assert format_result_with_unit(5.234, 'mg') == '5.23 mg'
+    assert format_result_with_unit(499.0, 'µl') == '499 µl'
+
+
+@pytest.mark.parametrize("text", [
+    "5", "5.2", " 5.2 ", "5.", ".5", "-.5", "+3", "1e-3", "1.2E+3",
+])
+def test_validate_decimal_input_accepts(text):
+    """Plain decimal numbers, with or without an exponent, are accepted."""
+    assert validate_decimal_input(text) == (True, text.strip(), "")
+
+
+@pytest.mark.parametrize("text", [
+    "abc", "inf", "-inf", "nan", "Infinity", "1_000", "1e", "e5", "--5", "0x10", "5.2.1",
+])
+def test_validate_decimal_input_rejects(text):
+    """Anything but a plain number is rejected, even text float() parses ("inf", "1_000")."""
+    assert validate_decimal_input(text) == (False, text, "Please enter a valid number")
+
+
+def test_validate_decimal_input_comma_and_empty():
+    """Commas and empty input get their own error messages."""
+    assert validate_decimal_input("5,2") == (
+        False, "5,2", "Please use period (.) for decimals, not comma (,)"
+    )
+    assert validate_decimal_input("   ") == (False, "", "Please enter a value")